@@ -10,7 +10,7 @@ from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Header, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings
@@ -32,7 +32,7 @@ from database import (
     get_agent_profile,
     get_alerts,
     acknowledge_alert,
-    insert_audit_log,
+    queue_audit_log,
     verify_transaction_integrity,
     get_stats,
     get_vendors,
@@ -46,6 +46,7 @@ from database import (
     delete_agent_wallet,
     save_recurring_schedule,
     get_recurring_schedules,
+    get_recurring_schedules_json,
     get_due_schedules,
     update_schedule_execution,
     update_schedule_failure,
@@ -60,11 +61,14 @@ from database import (
     mark_savings_withdrawn,
     delete_savings_plan,
     log_execution,
+    transaction,
     get_execution_history,
     create_notification,
     get_notifications,
     mark_notification_read,
-    mark_all_notifications_read
+    mark_all_notifications_read,
+    get_unread_notification_count,
+    sync_recurring_data
 )
 
 load_dotenv()
@@ -856,7 +860,7 @@ async def agent_request_payment(
                 if v_name and (req.vendor.lower() in v_name or v_name in req.vendor.lower()):
                     vendor_address = v["address"]
                     vendor_name = v.get("name", req.vendor)
-                    is_trusted = v.get("trusted", 0) == 1
+                    is_trusted = bool(v.get("trusted"))
                     break
             else:
                 raise HTTPException(
@@ -909,7 +913,7 @@ async def agent_request_payment(
         else:
             status = "approved"
 
-        insert_audit_log(
+        queue_audit_log(
             "agent_payment_requested",
             "agent_api",
             vendor_address,
@@ -986,6 +990,8 @@ async def register_agent_wallet(
             "user_address": req.user_address,
             "agent_address": req.agent_address
         }
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error("agent_wallet_registration_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -1059,8 +1065,7 @@ async def list_recurring_schedules(
     if not Web3.is_address(user_address):
         raise HTTPException(status_code=400, detail="Invalid address")
     
-    schedules = get_recurring_schedules(user_address, active_only)
-    return {"schedules": schedules, "count": len(schedules)}
+    return Response(content=get_recurring_schedules_json(user_address, active_only), media_type="application/json")
 
 @app.put("/api/v1/recurring/schedule/{schedule_id}")
 @limiter.limit("30/minute")
@@ -1274,28 +1279,22 @@ async def sync_recurring_data(
     }
     
     try:
-        synced_schedules = 0
-        synced_plans = 0
+        schedules = [
+            {**{k: v for k, v in schedule.items() if k in SCHEDULE_FIELDS}, "user_address": req.user_address}
+            for schedule in req.schedules
+        ]
+        plans = [
+            {**{k: v for k, v in plan.items() if k in PLAN_FIELDS}, "user_address": req.user_address}
+            for plan in req.savings_plans
+        ]
         
-        for schedule in req.schedules:
-           
-            filtered = {k: v for k, v in schedule.items() if k in SCHEDULE_FIELDS}
-            filtered["user_address"] = req.user_address
-            try:
-                save_recurring_schedule(filtered)
-                synced_schedules += 1
-            except Exception as e:
-                logger.warning("schedule_sync_failed", id=schedule.get('id'), error=str(e))
-        
-        for plan in req.savings_plans:
-           
-            filtered = {k: v for k, v in plan.items() if k in PLAN_FIELDS}
-            filtered["user_address"] = req.user_address
-            try:
-                save_savings_plan(filtered)
-                synced_plans += 1
-            except Exception as e:
-                logger.warning("plan_sync_failed", id=plan.get('id'), error=str(e))
+        result = sync_recurring_data(schedules, plans)
+        for schedule_id, error in result["failed_schedules"]:
+            logger.warning("schedule_sync_failed", id=schedule_id, error=error)
+        for plan_id, error in result["failed_plans"]:
+            logger.warning("plan_sync_failed", id=plan_id, error=error)
+        synced_schedules = result["synced_schedules"]
+        synced_plans = result["synced_plans"]
         
         logger.info(
             "recurring_data_synced",
@@ -1324,8 +1323,9 @@ async def get_all_recurring_data(
     if not Web3.is_address(user_address):
         raise HTTPException(status_code=400, detail="Invalid address")
     
-    schedules = get_recurring_schedules(user_address, active_only=False)
-    plans = get_savings_plans(user_address, active_only=False)
+    with transaction(readonly=True):
+        schedules = get_recurring_schedules(user_address, active_only=False)
+        plans = get_savings_plans(user_address, active_only=False)
     
     return {
         "schedules": schedules,
@@ -1375,6 +1375,19 @@ async def mark_all_read(
     count = mark_all_notifications_read(user_address)
     return {"success": True, "marked_read": count}
 
+@app.get("/api/v1/notifications/{user_address}/unread-count")
+@limiter.limit(settings.rate_limit)
+async def unread_notification_count(
+    request: Request,
+    user_address: str,
+    auth: bool = Depends(verify_api_key)
+):
+    """Count unread notifications for user"""
+    if not Web3.is_address(user_address):
+        raise HTTPException(status_code=400, detail="Invalid address")
+    
+    return {"unread": get_unread_notification_count(user_address)}
+
 
 @app.get("/api/v1/execution-history/{user_address}")
 @limiter.limit(settings.rate_limit)
@@ -1405,32 +1418,33 @@ async def log_agent_transaction(
     """
     try:
       
-        log_id = log_execution(
-            schedule_id=req.schedule_id,
-            savings_plan_id=req.savings_plan_id,
-            user_address=req.user_address,
-            execution_type=req.tx_type,
-            amount=req.amount,
-            destination=req.destination,
-            tx_hash=req.tx_hash,
-            status=req.status,
-            error_message=req.error_message
-        )
+        with transaction():
+            log_id = log_execution(
+                schedule_id=req.schedule_id,
+                savings_plan_id=req.savings_plan_id,
+                user_address=req.user_address,
+                execution_type=req.tx_type,
+                amount=req.amount,
+                destination=req.destination,
+                tx_hash=req.tx_hash,
+                status=req.status,
+                error_message=req.error_message
+            )
         
        
-        if req.status == "success" and req.tx_type in ['payment', 'savings_deposit']:
-            dest_name = req.destination_name or req.destination[:10] + "..."
-            if req.tx_type == 'payment':
-                message = f"✅ Sent {req.amount} MNEE to {dest_name}"
-            else:
-                message = f"💰 Deposited {req.amount} MNEE to savings"
+            if req.status == "success" and req.tx_type in ['payment', 'savings_deposit']:
+                dest_name = req.destination_name or req.destination[:10] + "..."
+                if req.tx_type == 'payment':
+                    message = f"✅ Sent {req.amount} MNEE to {dest_name}"
+                else:
+                    message = f"💰 Deposited {req.amount} MNEE to savings"
             
-            create_notification(
-                req.user_address,
-                req.tx_type,
-                message,
-                req.tx_hash
-            )
+                create_notification(
+                    req.user_address,
+                    req.tx_type,
+                    message,
+                    req.tx_hash
+                )
         
         logger.info(
             "agent_transaction_logged",
@@ -1513,7 +1527,7 @@ async def recurring_system_health(request: Request):
         from database import get_due_schedules
         from datetime import datetime
         stale_threshold = datetime.utcnow()
-        due_schedules = get_due_schedules(stale_threshold)
+        due_schedules = get_due_schedules(stale_threshold, limit=None)
         
         return {
             "status": "healthy",
@@ -1588,6 +1602,8 @@ async def create_or_update_agent_wallet(
         else:
             raise HTTPException(status_code=500, detail="Failed to save agent wallet")
             
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error("agent_wallet_save_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
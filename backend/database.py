@@ -1,13 +1,30 @@
 import os
+import atexit
+import io
+import csv
 import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+import logging
+import queue
+import re
+import itertools
+import threading
+import select
+import shutil
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import RealDictCursor, execute_batch, execute_values, register_default_jsonb
 
 try:
     from cryptography.fernet import Fernet
@@ -15,9 +32,266 @@ try:
 except ImportError:
     HAS_CRYPTO = False
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or DATABASE_URL
 ENCRYPTION_KEY = os.getenv("DB_ENCRYPTION_KEY")
-
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "4"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "32"))
+DB_READ_POOL_MAX = int(os.getenv("DB_READ_POOL_MAX", "16"))
+DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "5000"))
+DB_IDLE_TX_TIMEOUT_MS = int(os.getenv("DB_IDLE_TX_TIMEOUT_MS", "60000"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+COLUMN_TYPES = [
+    ('transactions', 'amount_wei', 'numeric', 'NUMERIC(78,0)', None),
+    ('transactions', 'executed', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('transactions', 'revoked', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('transactions', 'risk_factors', 'jsonb', 'JSONB', "'[]'"),
+    ('agents', 'total_volume_wei', 'numeric', 'NUMERIC(78,0)', '0'),
+    ('agents', 'avg_amount_wei', 'numeric', 'NUMERIC(78,0)', '0'),
+    ('agents', 'metadata', 'jsonb', 'JSONB', "'{}'"),
+    ('vendors', 'trusted', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('vendors', 'total_received_wei', 'numeric', 'NUMERIC(78,0)', '0'),
+    ('vendors', 'metadata', 'jsonb', 'JSONB', "'{}'"),
+    ('alerts', 'acknowledged', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('users', 'is_active', 'boolean', 'BOOLEAN', 'TRUE'),
+    ('recurring_schedules', 'is_trusted', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('recurring_schedules', 'is_active', 'boolean', 'BOOLEAN', 'TRUE'),
+    ('savings_plans', 'is_recurring', 'boolean', 'BOOLEAN', 'TRUE'),
+    ('savings_plans', 'is_active', 'boolean', 'BOOLEAN', 'TRUE'),
+    ('savings_plans', 'withdrawn', 'boolean', 'BOOLEAN', 'FALSE'),
+    ('notifications', 'is_read', 'boolean', 'BOOLEAN', 'FALSE'),
+]
+
+COLUMN_CASTS = {
+    ('agents', 'metadata'): "COALESCE(NULLIF(metadata, ''), '{}')::JSONB",
+    ('vendors', 'metadata'): "COALESCE(NULLIF(metadata, ''), '{}')::JSONB",
+}
+
+# Wei amounts and risk factors keep their string form at the API boundary.
+# Registered on pooled connections only, not process-wide.
+WEI_TEXT = psycopg2.extensions.new_type(psycopg2.extensions.DECIMAL.values, 'WEI_TEXT', lambda value, cursor: value)
+
+SCHEMA_VERSION = 3
+
+SCHEMA_RELATIONS = (
+    'schema_version', 'vaults', 'transactions', 'agents', 'vendors', 'alerts', 'audit_log', 'users',
+    'sessions', 'rate_limits', 'agent_wallets', 'recurring_schedules', 'savings_plans',
+    'execution_log', 'notifications',
+    'idx_tx_vault_time', 'idx_tx_pending', 'idx_tx_pending_vault', 'idx_tx_highrisk_pending', 'idx_tx_agent', 'idx_tx_vendor',
+    'idx_tx_timestamp', 'idx_tx_risk', 'idx_vaults_wallet', 'idx_vendors_wallet_count', 'idx_vendors_trusted_count', 'idx_alerts_tx',
+    'idx_alerts_severity', 'idx_alerts_ack_time', 'idx_alerts_unack', 'idx_audit_entity_time', 'idx_agent_wallets_user', 'idx_sessions_expires', 'idx_recurring_user',
+    'idx_savings_user', 'idx_due_sched', 'idx_due_savings',
+    'idx_exec_log_user_time', 'idx_notif_user_time', 'idx_notif_user_unread',
+    'execution_log_default', 'notifications_default', 'audit_log_default',
+)
+
+UTC_ISO_NOW = """to_char(NOW() AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')"""
+EPOCH_NOW = "EXTRACT(EPOCH FROM NOW())::integer"
+
+BULK_COPY_THRESHOLD = 200
+
+ASYNC_COMMIT = "SET LOCAL synchronous_commit = off; "
+
+AUDIT_FLUSH_SECONDS = 0.05
+AUDIT_BATCH_SIZE = 500
+AUDIT_MAX_ATTEMPTS = 3
+AUDIT_RETRY_SECONDS = 1
+DUE_BATCH_LIMIT = int(os.getenv("DUE_BATCH_LIMIT", "500"))
+STREAM_THRESHOLD = 500
+STREAM_ITERSIZE = 1000
+
+NOTIFY_CHANNEL = 'notif_changes'
+VENDOR_CHANNEL = 'vendor_changed'
+VAULT_CHANNEL = 'vault_changed'
+WALLET_CHANNEL = 'agent_wallet_changed'
+LISTEN_POLL_SECONDS = 5
+LOOKUP_CACHE_TTL = 300
+UNREAD_COUNT_TTL = 30
+
+PARTITIONED_TABLES = {'execution_log': 'executed_at', 'notifications': 'created_at', 'audit_log': 'created_at'}
+PARTITION_MONTHS_AHEAD = 3
+PURGE_BATCH_SIZE = 5000
+
+RECURRING_SCHEDULES_SQL = "SELECT * FROM recurring_schedules WHERE user_address = %s ORDER BY next_execution ASC"
+ACTIVE_RECURRING_SCHEDULES_SQL = "SELECT * FROM recurring_schedules WHERE user_address = %s AND is_active ORDER BY next_execution ASC"
+RECURRING_SCHEDULES_JSON_SQL = """
+    SELECT json_build_object(
+        'schedules', COALESCE(json_agg(s ORDER BY s.next_execution ASC), '[]'::json),
+        'count', COUNT(*)
+    )::text
+    FROM recurring_schedules s WHERE s.user_address = %s
+"""
+SAVINGS_PLANS_SQL = "SELECT * FROM savings_plans WHERE user_address = %s ORDER BY unlock_date ASC"
+ACTIVE_SAVINGS_PLANS_SQL = "SELECT * FROM savings_plans WHERE user_address = %s AND is_active AND NOT withdrawn ORDER BY unlock_date ASC"
+EXEC_HISTORY_SQL = "SELECT * FROM execution_log WHERE user_address = %s ORDER BY executed_at DESC LIMIT %s"
+NOTIFICATIONS_SQL = "SELECT * FROM notifications WHERE user_address = %s ORDER BY created_at DESC LIMIT %s"
+UNREAD_NOTIFICATIONS_SQL = "SELECT * FROM notifications WHERE user_address = %s AND NOT is_read ORDER BY created_at DESC LIMIT %s"
+PENDING_TX_SQL = "SELECT * FROM transactions WHERE NOT executed AND NOT revoked ORDER BY timestamp DESC"
+VAULT_PENDING_TX_SQL = "SELECT * FROM transactions WHERE NOT executed AND NOT revoked AND vault_address = %s ORDER BY timestamp DESC"
+TX_HISTORY_SQL = "SELECT * FROM transactions ORDER BY timestamp DESC LIMIT %s OFFSET %s"
+VAULT_TX_HISTORY_SQL = "SELECT * FROM transactions WHERE vault_address = %s ORDER BY timestamp DESC LIMIT %s OFFSET %s"
+
+PREPARED_STATEMENTS = {
+    'get_agent_wallet_stmt': "SELECT * FROM agent_wallets WHERE user_address = %s",
+    'get_agent_wallet_network_stmt': "SELECT * FROM agent_wallets WHERE user_address = %s AND network = %s",
+    'due_schedules_stmt': """
+        SELECT
+            id, user_address, vault_address, vendor, vendor_address, amount,
+            frequency, execution_time, next_execution, network, created_at
+        FROM recurring_schedules
+        WHERE is_active AND next_execution <= %s
+            AND (next_execution, id) > (%s, %s)
+        ORDER BY next_execution ASC, id ASC
+        LIMIT %s
+    """,
+    'due_savings_stmt': """
+        SELECT
+            id, user_address, agent_address, vault_address, contract_plan_id, name,
+            amount, frequency, execution_time, next_deposit, network, created_at
+        FROM savings_plans
+        WHERE is_active AND is_recurring
+            AND NOT withdrawn AND next_deposit <= %s
+            AND (next_deposit, id) > (%s, %s)
+        ORDER BY next_deposit ASC, id ASC
+        LIMIT %s
+    """,
+    'schedule_executed_stmt': f"""
+        UPDATE recurring_schedules SET
+            next_execution = %s,
+            last_executed = {UTC_ISO_NOW},
+            execution_count = execution_count + 1,
+            failed_count = 0,
+            last_error = NULL,
+            updated_at = NOW()
+        WHERE id = %s
+    """,
+    'schedule_failed_stmt': """
+        UPDATE recurring_schedules SET
+            failed_count = failed_count + 1,
+            last_error = %s,
+            is_active = CASE WHEN failed_count + 1 >= 3 THEN FALSE ELSE is_active END,
+            updated_at = NOW()
+        WHERE id = %s
+    """,
+    'savings_deposit_stmt': f"""
+        UPDATE savings_plans SET
+            deposits_completed = deposits_completed + 1,
+            total_saved = total_saved + %s,
+            next_deposit = %s,
+            last_deposit = {UTC_ISO_NOW},
+            updated_at = NOW()
+        WHERE id = %s
+    """,
+    'log_execution_stmt': """
+        INSERT INTO execution_log (
+            schedule_id, savings_plan_id, user_address, execution_type,
+            amount, destination, tx_hash, status, error_message
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING id
+    """,
+    'create_notification_stmt': """
+        INSERT INTO notifications (user_address, notification_type, message, tx_hash)
+        VALUES (%s, %s, %s, %s)
+        RETURNING id
+    """,
+    'mark_notification_read_stmt': "UPDATE notifications SET is_read = TRUE WHERE id = %s RETURNING user_address",
+    'insert_alert_stmt': """
+        INSERT INTO alerts (tx_id, alert_type, severity, message)
+        VALUES (%s, %s, %s, %s)
+    """,
+    'update_tx_status_stmt': """
+        UPDATE transactions SET
+            executed = COALESCE(%s, executed),
+            revoked = COALESCE(%s, revoked),
+            reason = COALESCE(%s, reason),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE tx_id = %s
+    """,
+    'get_transaction_stmt': "SELECT * FROM transactions WHERE tx_id = %s",
+    'get_vault_transaction_stmt': "SELECT * FROM transactions WHERE tx_id = %s AND vault_address = %s",
+    'exec_history_stmt': EXEC_HISTORY_SQL,
+    'notifications_stmt': NOTIFICATIONS_SQL,
+    'unread_notifications_stmt': UNREAD_NOTIFICATIONS_SQL,
+}
+
+TX_HASH_EXPR = """encode(sha256(convert_to(
+    '{"agent": ' || to_json(agent)::text || ', "amount": ' || to_json(amount_wei::text)::text ||
+    ', "timestamp": ' || timestamp::text || ', "tx_id": ' || tx_id::text ||
+    ', "vendor": ' || to_json(vendor)::text || '}', 'UTF8')), 'hex')"""
+
+SCHEDULE_UPDATE_FIELDS = (
+    'vendor', 'vendor_address', 'amount', 'frequency', 'execution_time',
+    'next_execution', 'reason', 'is_trusted', 'is_active'
+)
+
+SAVINGS_UPDATE_FIELDS = (
+    'name', 'amount', 'frequency', 'execution_time', 'next_deposit',
+    'is_active', 'total_saved', 'deposits_completed'
+)
+
+SCHEDULE_REQUIRED_FIELDS = (
+    'id', 'user_address', 'vault_address', 'vendor', 'vendor_address',
+    'amount', 'frequency', 'next_execution'
+)
+
+SAVINGS_REQUIRED_FIELDS = (
+    'id', 'user_address', 'vault_address', 'name', 'amount',
+    'lock_days', 'unlock_date', 'target_amount'
+)
+
+SCHEDULE_PATCH_SET = """
+    vendor = COALESCE(%s, recurring_schedules.vendor),
+    vendor_address = COALESCE(%s, recurring_schedules.vendor_address),
+    amount = COALESCE(%s, recurring_schedules.amount),
+    frequency = COALESCE(%s, recurring_schedules.frequency),
+    execution_time = COALESCE(%s, recurring_schedules.execution_time),
+    next_execution = COALESCE(%s, recurring_schedules.next_execution),
+    reason = COALESCE(%s, recurring_schedules.reason),
+    is_trusted = COALESCE(%s, recurring_schedules.is_trusted),
+    is_active = COALESCE(%s, recurring_schedules.is_active),
+    updated_at = NOW()
+"""
+
+SCHEDULE_UPSERT_SQL = f"""
+    INSERT INTO recurring_schedules (
+        id, user_address, agent_address, vault_address, payment_type,
+        vendor, vendor_address, amount, frequency, execution_time,
+        start_date, next_execution, reason, is_trusted, is_active,
+        network
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (id) DO UPDATE SET {SCHEDULE_PATCH_SET}
+"""
+
+SCHEDULE_PATCH_SQL = f"UPDATE recurring_schedules SET {SCHEDULE_PATCH_SET} WHERE id = %s"
+
+SAVINGS_PATCH_SET = """
+    name = COALESCE(%s, savings_plans.name),
+    amount = COALESCE(%s, savings_plans.amount),
+    frequency = %s,
+    next_deposit = %s,
+    is_active = COALESCE(%s, savings_plans.is_active),
+    deposits_completed = COALESCE(%s, savings_plans.deposits_completed),
+    total_saved = COALESCE(%s, savings_plans.total_saved),
+    last_deposit = COALESCE(%s, savings_plans.last_deposit),
+    updated_at = NOW()
+"""
+
+SAVINGS_UPSERT_SQL = f"""
+    INSERT INTO savings_plans (
+        id, user_address, agent_address, vault_address, contract_plan_id,
+        name, amount, frequency, lock_days, lock_type, execution_time,
+        start_date, next_deposit, unlock_date, reason, is_recurring,
+        is_active, total_deposits, target_amount, network
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (id) DO UPDATE SET {SAVINGS_PATCH_SET}
+"""
+
+SAVINGS_PATCH_SQL = f"UPDATE savings_plans SET {SAVINGS_PATCH_SET} WHERE id = %s"
+
+@lru_cache(maxsize=1)
 def get_cipher():
     if HAS_CRYPTO and ENCRYPTION_KEY:
         return Fernet(ENCRYPTION_KEY.encode())
@@ -48,31 +322,375 @@ def parse_database_url(url: str) -> Dict[str, Any]:
         'port': parsed.port or 5432
     }
 
+SESSION_OPTIONS = (
+    f"-c lock_timeout={DB_LOCK_TIMEOUT_MS} "
+    f"-c idle_in_transaction_session_timeout={DB_IDLE_TX_TIMEOUT_MS} "
+    "-c jit=off"
+)
+
+def _conn_params(url: Optional[str], options: str) -> Optional[Dict[str, Any]]:
+    if not url:
+        return None
+    return {
+        **parse_database_url(url),
+        'options': options,
+        'connect_timeout': DB_CONNECT_TIMEOUT,
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'application_name': 'sentinel-finance'
+    }
+
+CONN_PARAMS = _conn_params(DATABASE_URL, SESSION_OPTIONS)
+READ_CONN_PARAMS = _conn_params(DATABASE_READ_URL, SESSION_OPTIONS + " -c default_transaction_read_only=on")
+
+_pool = None
+_read_pool = None
+_pool_lock = threading.Lock()
+_active_conn: ContextVar = ContextVar('active_conn', default=None)
+
+_schema_ready = False
+
+class PooledConnection(psycopg2.extensions.connection):
+    prepared = None
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.invalidations = set()
+        psycopg2.extensions.register_type(WEI_TEXT, self)
+        register_default_jsonb(self, loads=lambda value: value)
+
+def get_pool() -> ThreadedConnectionPool:
+    global _pool
+    if _pool is None:
+        if not CONN_PARAMS:
+            raise ValueError("DATABASE_URL environment variable not set")
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, connection_factory=PooledConnection, **CONN_PARAMS)
+    return _pool
+
+def get_read_pool() -> ThreadedConnectionPool:
+    global _read_pool
+    if _read_pool is None:
+        if not READ_CONN_PARAMS:
+            raise ValueError("DATABASE_URL environment variable not set")
+        with _pool_lock:
+            if _read_pool is None:
+                _read_pool = ThreadedConnectionPool(1, DB_READ_POOL_MAX, connection_factory=PooledConnection, **READ_CONN_PARAMS)
+    return _read_pool
+
 @contextmanager
-def get_connection():
-    if not DATABASE_URL:
-        raise ValueError("DATABASE_URL environment variable not set")
+def get_connection(readonly: bool = False):
+    active = _active_conn.get()
+    if active is not None:
+        yield active
+        return
     
-    conn_params = parse_database_url(DATABASE_URL)
-    conn = psycopg2.connect(**conn_params)
-    conn.autocommit = False
+    pool = get_read_pool() if readonly else get_pool()
+    conn = pool.getconn()
     try:
+        conn.autocommit = False
+        if conn.prepared is None and _schema_ready:
+            _prepare_statements(conn)
         yield conn
-        conn.commit()
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.commit()
     except Exception as e:
-        conn.rollback()
+        if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        _apply_invalidations(conn.invalidations)
+        pool.putconn(conn, close=bool(conn.closed))
+
+@contextmanager
+def transaction(readonly: bool = False):
+    active = _active_conn.get()
+    if active is not None:
+        yield active
+        return
+    
+    with get_connection(readonly=readonly) as conn:
+        token = _active_conn.set(conn)
+        try:
+            yield conn
+        finally:
+            _active_conn.reset(token)
+
+_unread_counts: Dict[str, Tuple[float, int]] = {}
+_vendor_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_vault_cache: Dict[str, Tuple[float, Any]] = {}
+_wallet_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Any]] = {}
+_cache_lock = threading.Lock()
+_cache_generation = 0
+_listener = None
+
+# Container PIDs collide (every service runs as PID 1), so NOTIFY payloads carry a per-process token.
+PROCESS_TOKEN = uuid.uuid4().hex
+
+def _notify_change(cursor, channel: str, key: str):
+    cursor.execute("SELECT pg_notify(%s, %s)", (channel, f"{PROCESS_TOKEN}:{key}"))
+    cursor.connection.invalidations.add((channel, key))
+
+def _invalidate_from_notify(notify):
+    token, _, key = notify.payload.partition(':')
+    if token != PROCESS_TOKEN:
+        _invalidate(notify.channel, key)
+
+def _apply_invalidations(pending: set):
+    for channel, key in pending:
+        _invalidate(channel, key)
+    pending.clear()
+
+def _invalidate(channel: str, key: str):
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        if channel == NOTIFY_CHANNEL:
+            _unread_counts.pop(key, None)
+        elif channel == VENDOR_CHANNEL:
+            _drop_vendor_entries(key)
+        elif channel == VAULT_CHANNEL:
+            _vault_cache.pop(key, None)
+        elif channel == WALLET_CHANNEL:
+            _drop_wallet_entries(key)
+
+def _drop_vendor_entries(wallet: str):
+    for cache_key in [k for k in _vendor_cache if not wallet or k[0] in (wallet, '')]:
+        del _vendor_cache[cache_key]
+
+def _drop_wallet_entries(user: str):
+    for cache_key in [k for k in _wallet_cache if k[0] == user]:
+        del _wallet_cache[cache_key]
+
+def _clear_caches():
+    _unread_counts.clear()
+    _vendor_cache.clear()
+    _vault_cache.clear()
+    _wallet_cache.clear()
+
+def _cache_get(cache: dict, key):
+    entry = cache.get(key)
+    if entry and entry[0] > time.monotonic():
+        return entry
+    return None
+
+def _cache_put(cache: dict, key, value, generation: int, ttl: int = LOOKUP_CACHE_TTL):
+    if _ensure_listener():
+        with _cache_lock:
+            if generation == _cache_generation:
+                cache[key] = (time.monotonic() + ttl, value)
+
+def _listen_for_changes():
+    global _listener, _cache_generation
+    try:
+        conn = psycopg2.connect(**CONN_PARAMS)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        listen = conn.cursor()
+        for channel in (NOTIFY_CHANNEL, VENDOR_CHANNEL, VAULT_CHANNEL, WALLET_CHANNEL):
+            listen.execute(f"LISTEN {channel}")
+        while True:
+            if select.select([conn], [], [], LISTEN_POLL_SECONDS) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                _invalidate_from_notify(conn.notifies.pop(0))
+    except Exception:
+        with _cache_lock:
+            _cache_generation += 1
+            _clear_caches()
+            _listener = None
+
+def _ensure_listener() -> bool:
+    global _listener
+    if _listener is None and CONN_PARAMS:
+        with _cache_lock:
+            if _listener is None:
+                _listener = threading.Thread(target=_listen_for_changes, name="db-cache-listener", daemon=True)
+                _listener.start()
+    return _listener is not None
+
+def _prepare_statements(conn):
+    cursor = conn.cursor()
+    cursor.execute("DEALLOCATE ALL")
+    prepared = set()
+    for name, sql in PREPARED_STATEMENTS.items():
+        cursor.execute("SAVEPOINT prepare_stmt")
+        try:
+            cursor.execute(f"PREPARE {name} AS {_numbered_params(sql)}")
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT prepare_stmt")
+        else:
+            prepared.add(name)
+        cursor.execute("RELEASE SAVEPOINT prepare_stmt")
+    conn.commit()
+    conn.prepared = frozenset(prepared)
+
+def _numbered_params(sql: str) -> str:
+    counter = itertools.count(1)
+    return re.sub(r"%s", lambda match: f"${next(counter)}", sql)
+
+@lru_cache(maxsize=None)
+def _execute_sql(name: str, param_count: int) -> str:
+    return f"EXECUTE {name} ({', '.join(['%s'] * param_count)})"
+
+def _execute_prepared(cursor, name: str, params: tuple, prefix: str = ""):
+    if name in (cursor.connection.prepared or ()):
+        cursor.execute(prefix + _execute_sql(name, len(params)), params)
+    else:
+        cursor.execute(prefix + PREPARED_STATEMENTS[name], params)
+
+@lru_cache(maxsize=4096)
+def _addr(value: Optional[str]) -> Optional[str]:
+    return value if value is None or value.islower() else value.lower()
+
+def _fetch_rows(conn, name: str, sql: str, params: tuple, limit: int, prepared: Optional[str] = None) -> List[Dict[str, Any]]:
+    if limit <= STREAM_THRESHOLD:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        if prepared:
+            _execute_prepared(cursor, prepared, params)
+        else:
+            cursor.execute(sql, params)
+        return cursor.fetchall()
+    with conn.cursor(name=name, cursor_factory=RealDictCursor) as cursor:
+        cursor.itersize = STREAM_ITERSIZE
+        cursor.execute(sql, params)
+        return list(cursor)
+
+def _like_escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+@lru_cache(maxsize=None)
+def _update_sql(table: str, fields: Tuple[str, ...]) -> str:
+    set_clause = ", ".join(f"{field} = %s" for field in fields)
+    return f"UPDATE {table} SET {set_clause}, updated_at = NOW() WHERE id = %s"
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+_hash_encoder = json.JSONEncoder(sort_keys=True)
 
 def compute_hash(data: Dict[str, Any]) -> str:
-    sorted_data = json.dumps(data, sort_keys=True)
-    return hashlib.sha256(sorted_data.encode()).hexdigest()
+    return hashlib.sha256(_hash_encoder.encode(data).encode()).hexdigest()
+
+def _transaction_hash(tx_id, agent, vendor, amount, timestamp) -> str:
+    return compute_hash({"tx_id": tx_id, "agent": agent, "vendor": vendor, "amount": amount, "timestamp": timestamp})
+
+def _migrate_column_types(cursor):
+    cursor.execute("""
+        SELECT table_name, column_name, data_type FROM information_schema.columns
+        WHERE table_schema = current_schema()
+    """)
+    current = {(table, column): data_type for table, column, data_type in cursor.fetchall()}
+    
+    for table, column, data_type, sql_type, default in COLUMN_TYPES:
+        if current.get((table, column), data_type) == data_type:
+            continue
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        using = COLUMN_CASTS.get((table, column), f"{column}::{sql_type}")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {sql_type} USING {using}")
+        if default is not None:
+            cursor.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {default}")
+
+def _next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def _create_month_partitions(cursor, table: str, column: str, first: datetime, months_ahead: int = PARTITION_MONTHS_AHEAD):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = _utcnow()
+    for _ in range(months_ahead):
+        last = _next_month(last)
+    
+    while month <= last:
+        following = _next_month(month)
+        partition = f"{table}_{month:%Y_%m}"
+        cursor.execute("SELECT to_regclass(%s) IS NULL", (partition,))
+        if cursor.fetchone()[0]:
+            _create_month_partition(cursor, table, column, partition, (month.date().isoformat(), following.date().isoformat()))
+        month = following
+
+def _create_month_partition(cursor, table: str, column: str, partition: str, bounds: Tuple[str, str]):
+    default = f"{table}_default"
+    create_sql = f"CREATE TABLE {partition} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)"
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {column} >= %s AND {column} < %s)", bounds)
+    if not cursor.fetchone()[0]:
+        cursor.execute(create_sql, bounds)
+        return
+    
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    cursor.execute(create_sql, bounds)
+    cursor.execute(f"""
+        WITH moved AS (DELETE FROM {default} WHERE {column} >= %s AND {column} < %s RETURNING *)
+        INSERT INTO {table} SELECT * FROM moved
+    """, bounds)
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+def _partition_by_month(cursor, table: str, column: str, create_sql: str):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cursor.fetchone()
+    if row and row[0] == 'p':
+        return
+    
+    legacy = f"{table}_unpartitioned"
+    first = _utcnow()
+    if row:
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(f"SELECT MIN({column}) FROM {legacy}")
+        oldest = cursor.fetchone()[0]
+        if oldest and oldest < first:
+            first = oldest
+    
+    cursor.execute(create_sql)
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    _create_month_partitions(cursor, table, column, first)
+    
+    if row:
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+        cursor.execute(f"DROP TABLE {legacy}")
+
+def _drop_month_partitions(cursor, table: str, before: datetime) -> int:
+    cursor.execute("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, (table,))
+    
+    dropped = 0
+    for (name,) in cursor.fetchall():
+        try:
+            month = datetime.strptime(name[len(table) + 1:], '%Y_%m')
+        except ValueError:
+            continue
+        if _next_month(month) <= before:
+            cursor.execute(f"SELECT COUNT(*) FROM {name}")
+            dropped += cursor.fetchone()[0]
+            cursor.execute(f"DROP TABLE {name}")
+    return dropped
+
+def ensure_partitions():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext('partition_upkeep'))")
+        for table, column in PARTITIONED_TABLES.items():
+            _create_month_partitions(cursor, table, column, _utcnow())
 
 def init_db():
+    global _schema_ready
+    _create_schema()
+    ensure_partitions()
+    _schema_ready = True
+
+def _create_schema():
     with get_connection() as conn:
         cursor = conn.cursor()
 
+        cursor.execute("SELECT COUNT(*) FROM pg_class WHERE relname = ANY(%s) AND pg_table_is_visible(oid)", (list(SCHEMA_RELATIONS),))
+        if cursor.fetchone()[0] == len(SCHEMA_RELATIONS):
+            cursor.execute("SELECT MAX(version) FROM schema_version")
+            if (cursor.fetchone()[0] or 0) >= SCHEMA_VERSION:
+                return
+
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS vaults (
                 id SERIAL PRIMARY KEY,
@@ -90,14 +708,14 @@ def init_db():
                 vault_address TEXT NOT NULL,
                 agent TEXT NOT NULL,
                 vendor TEXT NOT NULL,
-                amount_wei TEXT NOT NULL,
+                amount_wei NUMERIC(78,0) NOT NULL,
                 timestamp INTEGER NOT NULL,
                 execute_after INTEGER NOT NULL,
-                executed INTEGER DEFAULT 0,
-                revoked INTEGER DEFAULT 0,
+                executed BOOLEAN DEFAULT FALSE,
+                revoked BOOLEAN DEFAULT FALSE,
                 reason TEXT DEFAULT '',
                 risk_score REAL DEFAULT 0,
-                risk_factors TEXT DEFAULT '[]',
+                risk_factors JSONB DEFAULT '[]',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 hash TEXT NOT NULL,
@@ -109,11 +727,11 @@ def init_db():
             CREATE TABLE IF NOT EXISTS agents (
                 address TEXT PRIMARY KEY,
                 total_transactions INTEGER DEFAULT 0,
-                total_volume_wei TEXT DEFAULT '0',
-                avg_amount_wei TEXT DEFAULT '0',
+                total_volume_wei NUMERIC(78,0) DEFAULT 0,
+                avg_amount_wei NUMERIC(78,0) DEFAULT 0,
                 last_active INTEGER,
                 risk_level TEXT DEFAULT 'low',
-                metadata TEXT DEFAULT '{}',
+                metadata JSONB DEFAULT '{}',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -124,11 +742,11 @@ def init_db():
                 id SERIAL PRIMARY KEY,
                 wallet_address TEXT NOT NULL,
                 address TEXT NOT NULL,
-                trusted INTEGER DEFAULT 0,
-                total_received_wei TEXT DEFAULT '0',
+                trusted BOOLEAN DEFAULT FALSE,
+                total_received_wei NUMERIC(78,0) DEFAULT 0,
                 transaction_count INTEGER DEFAULT 0,
                 name TEXT DEFAULT '',
-                metadata TEXT DEFAULT '{}',
+                metadata JSONB DEFAULT '{}',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(wallet_address, address)
@@ -142,36 +760,20 @@ def init_db():
                 alert_type TEXT NOT NULL,
                 severity TEXT NOT NULL,
                 message TEXT NOT NULL,
-                acknowledged INTEGER DEFAULT 0,
+                acknowledged BOOLEAN DEFAULT FALSE,
                 acknowledged_by TEXT,
                 acknowledged_at TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS audit_log (
-                id SERIAL PRIMARY KEY,
-                action TEXT NOT NULL,
-                entity_type TEXT NOT NULL,
-                entity_id TEXT NOT NULL,
-                old_value TEXT,
-                new_value TEXT,
-                performed_by TEXT NOT NULL,
-                ip_address TEXT,
-                user_agent TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                hash TEXT NOT NULL
-            )
-        """)
-
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id SERIAL PRIMARY KEY,
                 username TEXT UNIQUE NOT NULL,
                 password_hash TEXT NOT NULL,
                 role TEXT DEFAULT 'viewer',
-                is_active INTEGER DEFAULT 1,
+                is_active BOOLEAN DEFAULT TRUE,
                 last_login TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
@@ -224,8 +826,8 @@ def init_db():
                 start_date TEXT NOT NULL,
                 next_execution TEXT NOT NULL,
                 reason TEXT DEFAULT '',
-                is_trusted INTEGER DEFAULT 0,
-                is_active INTEGER DEFAULT 1,
+                is_trusted BOOLEAN DEFAULT FALSE,
+                is_active BOOLEAN DEFAULT TRUE,
                 network TEXT DEFAULT 'mainnet',
                 execution_count INTEGER DEFAULT 0,
                 failed_count INTEGER DEFAULT 0,
@@ -253,22 +855,26 @@ def init_db():
                 next_deposit TEXT,
                 unlock_date TEXT NOT NULL,
                 reason TEXT DEFAULT '',
-                is_recurring INTEGER DEFAULT 1,
-                is_active INTEGER DEFAULT 1,
+                is_recurring BOOLEAN DEFAULT TRUE,
+                is_active BOOLEAN DEFAULT TRUE,
                 total_deposits INTEGER DEFAULT 1,
                 deposits_completed INTEGER DEFAULT 0,
                 total_saved REAL DEFAULT 0,
                 target_amount REAL NOT NULL,
-                withdrawn INTEGER DEFAULT 0,
+                withdrawn BOOLEAN DEFAULT FALSE,
                 last_deposit TEXT,
+                network TEXT DEFAULT 'mainnet',
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS execution_log (
-                id SERIAL PRIMARY KEY,
+        cursor.execute("ALTER TABLE savings_plans ADD COLUMN IF NOT EXISTS network TEXT DEFAULT 'mainnet'")
+        _migrate_column_types(cursor)
+
+        _partition_by_month(cursor, 'execution_log', 'executed_at', """
+            CREATE TABLE execution_log (
+                id SERIAL,
                 schedule_id TEXT,
                 savings_plan_id TEXT,
                 user_address TEXT NOT NULL,
@@ -278,45 +884,111 @@ def init_db():
                 tx_hash TEXT,
                 status TEXT NOT NULL,
                 error_message TEXT,
-                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+                executed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, executed_at)
+            ) PARTITION BY RANGE (executed_at)
         """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS notifications (
-                id SERIAL PRIMARY KEY,
+        _partition_by_month(cursor, 'notifications', 'created_at', """
+            CREATE TABLE notifications (
+                id SERIAL,
                 user_address TEXT NOT NULL,
                 notification_type TEXT NOT NULL,
                 message TEXT NOT NULL,
                 tx_hash TEXT,
-                is_read INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+                is_read BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+
+        _partition_by_month(cursor, 'audit_log', 'created_at', """
+            CREATE TABLE audit_log (
+                id SERIAL,
+                action TEXT NOT NULL,
+                entity_type TEXT NOT NULL,
+                entity_id TEXT NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                performed_by TEXT NOT NULL,
+                ip_address TEXT,
+                user_agent TEXT,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
         """)
 
-       
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_vault ON transactions(vault_address)")
+        for index in (
+            'idx_tx_vault', 'idx_vendors_wallet', 'idx_alerts_ack', 'idx_execution_user', 'idx_notifications_user',
+            'idx_tx_executed', 'idx_tx_revoked', 'idx_recurring_active', 'idx_savings_active', 'idx_notifications_read',
+            'idx_recurring_next', 'idx_savings_next'
+        ):
+            cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_vault_time ON transactions(vault_address, timestamp DESC) INCLUDE (executed, revoked)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_pending ON transactions(timestamp DESC)
+            INCLUDE (vault_address) WHERE NOT executed AND NOT revoked
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_pending_vault ON transactions(vault_address, timestamp DESC)
+            WHERE NOT executed AND NOT revoked
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tx_highrisk_pending ON transactions(risk_score)
+            WHERE NOT executed AND NOT revoked
+        """)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_agent ON transactions(agent)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_vendor ON transactions(vendor)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_timestamp ON transactions(timestamp)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_executed ON transactions(executed)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_revoked ON transactions(revoked)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tx_risk ON transactions(risk_score)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_vaults_wallet ON vaults(wallet_address)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_wallet ON vendors(wallet_address)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_wallet_count ON vendors(wallet_address, transaction_count DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_trusted_count ON vendors(transaction_count DESC) WHERE trusted")
+        cursor.execute("SAVEPOINT vendor_trgm")
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute("DROP INDEX IF EXISTS idx_vendors_name_trgm")
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_vendors_trusted_name_trgm ON vendors
+                USING gin (LOWER(name) gin_trgm_ops) WHERE trusted
+            """)
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT vendor_trgm")
+        cursor.execute("RELEASE SAVEPOINT vendor_trgm")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_tx ON alerts(tx_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_ack ON alerts(acknowledged)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_ack_time ON alerts(acknowledged, created_at DESC)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_unack ON alerts(created_at DESC) WHERE NOT acknowledged")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_entity_time ON audit_log(entity_type, entity_id, created_at DESC)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_wallets_user ON agent_wallets(user_address)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_user ON recurring_schedules(user_address)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_next ON recurring_schedules(next_execution)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_recurring_active ON recurring_schedules(is_active)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_savings_user ON savings_plans(user_address)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_savings_next ON savings_plans(next_deposit)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_savings_active ON savings_plans(is_active)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_execution_user ON execution_log(user_address)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_address)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(is_read)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_due_sched ON recurring_schedules(next_execution)
+            INCLUDE (user_address, network) WHERE is_active
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_due_savings ON savings_plans(next_deposit)
+            INCLUDE (user_address) WHERE is_active AND is_recurring AND NOT withdrawn
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_exec_log_user_time ON execution_log(user_address, executed_at DESC)
+            INCLUDE (execution_type, amount, status)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_notif_user_time ON notifications(user_address, created_at DESC)")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_notif_user_unread ON notifications(user_address, created_at DESC)
+            WHERE NOT is_read
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL);
+            DELETE FROM schema_version;
+            INSERT INTO schema_version (version) VALUES (%s);
+        """, (SCHEMA_VERSION,))
 
         conn.commit()
         print("Database initialized successfully")
@@ -327,231 +999,192 @@ def init_db():
 def save_agent_wallet(user_address: str, agent_address: str, vault_address: str, encrypted_key: str, network: str = 'mainnet') -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
+        user_address, agent_address, vault_address = _addr(user_address), _addr(agent_address), _addr(vault_address)
         
-        cursor.execute("SELECT id FROM agent_wallets WHERE user_address = %s AND network = %s", (user_address.lower(), network))
-        existing = cursor.fetchone()
-        
-        if existing:
-            cursor.execute("""
-                UPDATE agent_wallets 
-                SET agent_address = %s, vault_address = %s, encrypted_key = %s, updated_at = %s
-                WHERE user_address = %s AND network = %s
-            """, (agent_address.lower(), vault_address.lower(), encrypted_key, now_iso, user_address.lower(), network))
-        else:
-            cursor.execute("""
-                INSERT INTO agent_wallets (user_address, agent_address, vault_address, encrypted_key, network, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (user_address.lower(), agent_address.lower(), vault_address.lower(), encrypted_key, network, now_iso, now_iso))
-        
-        return cursor.rowcount > 0
+        cursor.execute("""
+            INSERT INTO agent_wallets (user_address, agent_address, vault_address, encrypted_key, network)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (user_address) DO UPDATE SET
+                agent_address = EXCLUDED.agent_address,
+                vault_address = EXCLUDED.vault_address,
+                encrypted_key = EXCLUDED.encrypted_key,
+                updated_at = NOW()
+            WHERE agent_wallets.network = EXCLUDED.network
+        """, (user_address, agent_address, vault_address, encrypted_key, network))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Agent wallet for {user_address} is already registered on another network")
+        _notify_change(cursor, WALLET_CHANNEL, user_address)
+        return True
 
 def get_agent_wallet(user_address: str, network: str = None) -> Optional[Dict[str, Any]]:
+    cache_key = (_addr(user_address), network or None)
+    cached = _cache_get(_wallet_cache, cache_key)
+    if cached:
+        return cached[1]
+    
+    generation = _cache_generation
     with get_connection() as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         if network:
-            cursor.execute("SELECT * FROM agent_wallets WHERE user_address = %s AND network = %s", (user_address.lower(), network))
+            _execute_prepared(cursor, 'get_agent_wallet_network_stmt', cache_key)
         else:
-            cursor.execute("SELECT * FROM agent_wallets WHERE user_address = %s", (user_address.lower(),))
+            _execute_prepared(cursor, 'get_agent_wallet_stmt', cache_key[:1])
         row = cursor.fetchone()
-        return dict(row) if row else None
+    _cache_put(_wallet_cache, cache_key, row, generation)
+    return row
 
 def delete_agent_wallet(user_address: str, network: str = None) -> bool:
+    user_address = _addr(user_address)
     with get_connection() as conn:
         cursor = conn.cursor()
         if network:
-            cursor.execute("DELETE FROM agent_wallets WHERE user_address = %s AND network = %s", (user_address.lower(), network))
+            cursor.execute("DELETE FROM agent_wallets WHERE user_address = %s AND network = %s", (user_address, network))
         else:
-            cursor.execute("DELETE FROM agent_wallets WHERE user_address = %s", (user_address.lower(),))
-        return cursor.rowcount > 0
-
-
-
+            cursor.execute("DELETE FROM agent_wallets WHERE user_address = %s", (user_address,))
+        changed = cursor.rowcount > 0
+        if changed:
+            _notify_change(cursor, WALLET_CHANNEL, user_address)
+        return changed
+
+
+
+
+def _schedule_row(schedule: Dict[str, Any]) -> tuple:
+    return (
+        schedule['id'],
+        _addr(schedule['user_address']),
+        _addr(schedule.get('agent_address', '')),
+        _addr(schedule['vault_address']),
+        schedule.get('payment_type', 'vendor'),
+        schedule['vendor'],
+        _addr(schedule['vendor_address']),
+        schedule['amount'],
+        schedule['frequency'],
+        schedule.get('execution_time', '09:00'),
+        schedule.get('start_date') or _utcnow().isoformat(),
+        schedule['next_execution'],
+        schedule.get('reason', ''),
+        bool(schedule.get('is_trusted', False)),
+        bool(schedule.get('is_active', True)),
+        schedule.get('network', 'mainnet')
+    )
 
 def save_recurring_schedule(schedule: Dict[str, Any]) -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        now_iso = datetime.utcnow().isoformat()
-        
-        cursor.execute("SELECT * FROM recurring_schedules WHERE id = %s", (schedule['id'],))
-        existing = cursor.fetchone()
-        
-        if existing:
-            cursor.execute("""
-                UPDATE recurring_schedules SET
-                    vendor = %s, vendor_address = %s, amount = %s, frequency = %s,
-                    execution_time = %s, next_execution = %s, reason = %s,
-                    is_trusted = %s, is_active = %s, updated_at = %s
-                WHERE id = %s
-            """, (
-                schedule.get('vendor', existing['vendor']),
-                schedule.get('vendor_address', existing['vendor_address']),
-                schedule.get('amount', existing['amount']),
-                schedule.get('frequency', existing['frequency']),
-                schedule.get('execution_time', existing['execution_time']),
-                schedule.get('next_execution', existing['next_execution']),
-                schedule.get('reason', existing['reason']),
-                1 if schedule.get('is_trusted', existing['is_trusted']) else 0,
-                1 if schedule.get('is_active', existing['is_active']) else 0,
-                now_iso, schedule['id']
-            ))
-        else:
-            cursor.execute("""
-                INSERT INTO recurring_schedules (
-                    id, user_address, agent_address, vault_address, payment_type,
-                    vendor, vendor_address, amount, frequency, execution_time,
-                    start_date, next_execution, reason, is_trusted, is_active,
-                    network, created_at, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                schedule['id'],
-                schedule['user_address'].lower(),
-                schedule.get('agent_address', '').lower(),
-                schedule['vault_address'].lower(),
-                schedule.get('payment_type', 'vendor'),
-                schedule['vendor'],
-                schedule['vendor_address'].lower(),
-                schedule['amount'],
-                schedule['frequency'],
-                schedule.get('execution_time', '09:00'),
-                schedule.get('start_date', now_iso),
-                schedule['next_execution'],
-                schedule.get('reason', ''),
-                1 if schedule.get('is_trusted', False) else 0,
-                1 if schedule.get('is_active', True) else 0,
-                schedule.get('network', 'mainnet'),
-                now_iso, now_iso
-            ))
-        
-        return cursor.rowcount > 0
+        return _save_recurring_schedule(conn.cursor(cursor_factory=RealDictCursor), schedule)
+
+def _optional_bool(value) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+def _schedule_patch(schedule: Dict[str, Any]) -> tuple:
+    return (
+        schedule.get('vendor'),
+        _addr(schedule.get('vendor_address')),
+        schedule.get('amount'),
+        schedule.get('frequency'),
+        schedule.get('execution_time'),
+        schedule.get('next_execution'),
+        schedule.get('reason'),
+        _optional_bool(schedule.get('is_trusted')),
+        _optional_bool(schedule.get('is_active'))
+    )
+
+def _missing_fields(item: Dict[str, Any], fields: Tuple[str, ...]) -> List[str]:
+    return [field for field in fields if field not in item]
+
+def _save_recurring_schedule(cursor, schedule: Dict[str, Any]) -> bool:
+    patch = _schedule_patch(schedule)
+    missing = _missing_fields(schedule, SCHEDULE_REQUIRED_FIELDS)
+    if missing:
+        cursor.execute(SCHEDULE_PATCH_SQL, patch + (schedule['id'],))
+        if cursor.rowcount == 0:
+            raise ValueError(f"New schedule {schedule['id']} is missing required fields {missing}")
+    else:
+        cursor.execute(SCHEDULE_UPSERT_SQL, _schedule_row(schedule) + patch)
+    return cursor.rowcount > 0
 
 def get_recurring_schedules(user_address: str, active_only: bool = True) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        if active_only:
-            cursor.execute("""
-                SELECT * FROM recurring_schedules 
-                WHERE user_address = %s AND is_active = 1
-                ORDER BY next_execution ASC
-            """, (user_address.lower(),))
-        else:
-            cursor.execute("""
-                SELECT * FROM recurring_schedules 
-                WHERE user_address = %s
-                ORDER BY next_execution ASC
-            """, (user_address.lower(),))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
-
-def get_due_schedules(before: datetime) -> List[Dict[str, Any]]:
+        cursor.execute(ACTIVE_RECURRING_SCHEDULES_SQL if active_only else RECURRING_SCHEDULES_SQL, (_addr(user_address),))
+        return cursor.fetchall()
+
+def get_recurring_schedules_json(user_address: str, active_only: bool = True) -> str:
+    sql = RECURRING_SCHEDULES_JSON_SQL + (" AND s.is_active" if active_only else "")
+    with get_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, (_addr(user_address),))
+        return cursor.fetchone()[0]
+
+def _attach_agent_wallets(cursor, rows: List[Dict[str, Any]], agent_key: str) -> List[Dict[str, Any]]:
+    keys = {(row['user_address'], row['network']) for row in rows}
+    wallets = {}
+    if keys:
+        cursor.execute("""
+            SELECT user_address, network, agent_address, encrypted_key FROM agent_wallets
+            WHERE (user_address, network) IN %s
+        """, (tuple(keys),))
+        wallets = {(w['user_address'], w['network']): w for w in cursor.fetchall()}
+    
+    for row in rows:
+        wallet = wallets.get((row['user_address'], row['network']), {})
+        row['encrypted_key'] = wallet.get('encrypted_key')
+        row[agent_key] = wallet.get('agent_address')
+    return rows
+
+def get_due_schedules(before: datetime, limit: Optional[int] = DUE_BATCH_LIMIT, after: Tuple[str, str] = ('', '')) -> List[Dict[str, Any]]:
     with get_connection() as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("""
-            SELECT s.*, a.encrypted_key, a.agent_address
-            FROM recurring_schedules s
-            LEFT JOIN agent_wallets a ON s.user_address = a.user_address AND s.network = a.network
-            WHERE s.is_active = 1 AND s.next_execution <= %s
-            ORDER BY s.next_execution ASC
-        """, (before.isoformat(),))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        _execute_prepared(cursor, 'due_schedules_stmt', (before.isoformat(),) + tuple(after) + (limit,))
+        return _attach_agent_wallets(cursor, cursor.fetchall(), 'agent_address')
 
 def update_schedule_execution(schedule_id: str, tx_hash: str, next_execution: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
-        cursor.execute("""
-            UPDATE recurring_schedules SET
-                next_execution = %s,
-                last_executed = %s,
-                execution_count = execution_count + 1,
-                failed_count = 0,
-                last_error = NULL,
-                updated_at = %s
-            WHERE id = %s
-        """, (next_execution, now_iso, now_iso, schedule_id))
+        _execute_prepared(cursor, 'schedule_executed_stmt', (next_execution, schedule_id))
         return cursor.rowcount > 0
 
 def update_schedule_failure(schedule_id: str, error: str) -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        now_iso = datetime.utcnow().isoformat()
-        
-        cursor.execute("SELECT failed_count FROM recurring_schedules WHERE id = %s", (schedule_id,))
-        row = cursor.fetchone()
-        failed_count = (row['failed_count'] if row else 0) + 1
-        
-        is_active = 1 if failed_count < 3 else 0
-        
-        cursor.execute("""
-            UPDATE recurring_schedules SET
-                failed_count = %s,
-                last_error = %s,
-                is_active = %s,
-                updated_at = %s
-            WHERE id = %s
-        """, (failed_count, error, is_active, now_iso, schedule_id))
+        cursor = conn.cursor()
+        _execute_prepared(cursor, 'schedule_failed_stmt', (error, schedule_id))
         return cursor.rowcount > 0
 
 def pause_schedule(schedule_id: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            UPDATE recurring_schedules SET is_active = 0, updated_at = %s
+            UPDATE recurring_schedules SET is_active = FALSE, updated_at = NOW()
             WHERE id = %s
-        """, (datetime.utcnow().isoformat(), schedule_id))
+        """, (schedule_id,))
         return cursor.rowcount > 0
 
 def resume_schedule(schedule_id: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            UPDATE recurring_schedules SET is_active = 1, failed_count = 0, updated_at = %s
+            UPDATE recurring_schedules SET is_active = TRUE, failed_count = 0, updated_at = NOW()
             WHERE id = %s
-        """, (datetime.utcnow().isoformat(), schedule_id))
+        """, (schedule_id,))
         return cursor.rowcount > 0
 
 def update_schedule(schedule_id: str, updates: Dict[str, Any]) -> bool:
     if not updates:
         return False
     
+    fields = tuple(field for field in SCHEDULE_UPDATE_FIELDS if field in updates)
+    if not fields:
+        return False
+    
+    values = [
+        bool(updates[field]) if field in ('is_trusted', 'is_active') else updates[field]
+        for field in fields
+    ]
+    values.append(schedule_id)
+    
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
-        
-        set_clauses = []
-        values = []
-        
-        allowed_fields = {
-            'vendor': 'vendor',
-            'vendor_address': 'vendor_address',
-            'amount': 'amount',
-            'frequency': 'frequency',
-            'execution_time': 'execution_time',
-            'next_execution': 'next_execution',
-            'reason': 'reason',
-            'is_trusted': 'is_trusted',
-            'is_active': 'is_active'
-        }
-        
-        for key, db_field in allowed_fields.items():
-            if key in updates:
-                value = updates[key]
-                if key in ('is_trusted', 'is_active'):
-                    value = 1 if value else 0
-                set_clauses.append(f"{db_field} = %s")
-                values.append(value)
-        
-        if not set_clauses:
-            return False
-        
-        set_clauses.append("updated_at = %s")
-        values.append(now_iso)
-        values.append(schedule_id)
-        
-        query = f"UPDATE recurring_schedules SET {', '.join(set_clauses)} WHERE id = %s"
-        cursor.execute(query, values)
-        
+        cursor.execute(_update_sql('recurring_schedules', fields), values)
         return cursor.rowcount > 0
 
 def get_schedule_by_id(schedule_id: str) -> Optional[Dict[str, Any]]:
@@ -559,7 +1192,7 @@ def get_schedule_by_id(schedule_id: str) -> Optional[Dict[str, Any]]:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         cursor.execute("SELECT * FROM recurring_schedules WHERE id = %s", (schedule_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
 def delete_schedule(schedule_id: str) -> bool:
     with get_connection() as conn:
@@ -570,178 +1203,117 @@ def delete_schedule(schedule_id: str) -> bool:
 
 
 
+def _savings_row(plan: Dict[str, Any]) -> tuple:
+    return (
+        plan['id'],
+        _addr(plan['user_address']),
+        _addr(plan.get('agent_address') or None),
+        _addr(plan['vault_address']),
+        plan.get('contract_plan_id'),
+        plan['name'],
+        plan['amount'],
+        plan.get('frequency'),
+        plan['lock_days'],
+        plan.get('lock_type', 0),
+        plan.get('execution_time', '09:00'),
+        plan.get('start_date') or _utcnow().isoformat(),
+        plan.get('next_deposit'),
+        plan['unlock_date'],
+        plan.get('reason', ''),
+        bool(plan.get('is_recurring', True)),
+        bool(plan.get('is_active', True)),
+        plan.get('total_deposits', 1),
+        plan['target_amount'],
+        plan.get('network', 'mainnet')
+    )
+
 def save_savings_plan(plan: Dict[str, Any]) -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        now_iso = datetime.utcnow().isoformat()
-        
-        cursor.execute("SELECT * FROM savings_plans WHERE id = %s", (plan['id'],))
-        existing = cursor.fetchone()
-        
-        if existing:
-            cursor.execute("""
-                UPDATE savings_plans SET
-                    name = %s, amount = %s, frequency = %s, next_deposit = %s,
-                    is_active = %s, deposits_completed = %s, total_saved = %s,
-                    last_deposit = %s, updated_at = %s
-                WHERE id = %s
-            """, (
-                plan.get('name', existing['name']),
-                plan.get('amount', existing['amount']),
-                plan.get('frequency'),
-                plan.get('next_deposit'),
-                1 if plan.get('is_active', existing['is_active']) else 0,
-                plan.get('deposits_completed', existing['deposits_completed']),
-                plan.get('total_saved', existing['total_saved']),
-                plan.get('last_deposit'),
-                now_iso, plan['id']
-            ))
-        else:
-            cursor.execute("""
-                INSERT INTO savings_plans (
-                    id, user_address, agent_address, vault_address, contract_plan_id,
-                    name, amount, frequency, lock_days, lock_type, execution_time,
-                    start_date, next_deposit, unlock_date, reason, is_recurring,
-                    is_active, total_deposits, target_amount, network, created_at, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                plan['id'],
-                plan['user_address'].lower(),
-                plan.get('agent_address', '').lower() if plan.get('agent_address') else None,
-                plan['vault_address'].lower(),
-                plan.get('contract_plan_id'),
-                plan['name'],
-                plan['amount'],
-                plan.get('frequency'),
-                plan['lock_days'],
-                plan.get('lock_type', 0),
-                plan.get('execution_time', '09:00'),
-                plan.get('start_date', now_iso),
-                plan.get('next_deposit'),
-                plan['unlock_date'],
-                plan.get('reason', ''),
-                1 if plan.get('is_recurring', True) else 0,
-                1 if plan.get('is_active', True) else 0,
-                plan.get('total_deposits', 1),
-                plan['target_amount'],
-                plan.get('network', 'mainnet'),
-                now_iso, now_iso
-            ))
-        
-        return cursor.rowcount > 0
+        return _save_savings_plan(conn.cursor(cursor_factory=RealDictCursor), plan)
+
+def _savings_patch(plan: Dict[str, Any]) -> tuple:
+    return (
+        plan.get('name'),
+        plan.get('amount'),
+        plan.get('frequency'),
+        plan.get('next_deposit'),
+        _optional_bool(plan.get('is_active')),
+        plan.get('deposits_completed'),
+        plan.get('total_saved'),
+        plan.get('last_deposit')
+    )
+
+def _save_savings_plan(cursor, plan: Dict[str, Any]) -> bool:
+    patch = _savings_patch(plan)
+    missing = _missing_fields(plan, SAVINGS_REQUIRED_FIELDS)
+    if missing:
+        cursor.execute(SAVINGS_PATCH_SQL, patch + (plan['id'],))
+        if cursor.rowcount == 0:
+            raise ValueError(f"New savings plan {plan['id']} is missing required fields {missing}")
+    else:
+        cursor.execute(SAVINGS_UPSERT_SQL, _savings_row(plan) + patch)
+    return cursor.rowcount > 0
 
 def get_savings_plans(user_address: str, active_only: bool = False) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        if active_only:
-            cursor.execute("""
-                SELECT * FROM savings_plans 
-                WHERE user_address = %s AND is_active = 1 AND withdrawn = 0
-                ORDER BY unlock_date ASC
-            """, (user_address.lower(),))
-        else:
-            cursor.execute("""
-                SELECT * FROM savings_plans 
-                WHERE user_address = %s
-                ORDER BY unlock_date ASC
-            """, (user_address.lower(),))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        cursor.execute(ACTIVE_SAVINGS_PLANS_SQL if active_only else SAVINGS_PLANS_SQL, (_addr(user_address),))
+        return cursor.fetchall()
 
 def get_savings_plan_by_id(plan_id: str) -> Optional[Dict[str, Any]]:
     with get_connection() as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         cursor.execute("SELECT * FROM savings_plans WHERE id = %s", (plan_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
-def get_due_savings_deposits(before: datetime) -> List[Dict[str, Any]]:
+def get_due_savings_deposits(before: datetime, limit: Optional[int] = DUE_BATCH_LIMIT, after: Tuple[str, str] = ('', '')) -> List[Dict[str, Any]]:
     with get_connection() as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("""
-            SELECT p.*, a.encrypted_key, a.agent_address as wallet_agent_address
-            FROM savings_plans p
-            LEFT JOIN agent_wallets a ON p.user_address = a.user_address AND p.network = a.network
-            WHERE p.is_active = 1 AND p.is_recurring = 1 
-                AND p.withdrawn = 0 AND p.next_deposit <= %s
-            ORDER BY p.next_deposit ASC
-        """, (before.isoformat(),))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        _execute_prepared(cursor, 'due_savings_stmt', (before.isoformat(),) + tuple(after) + (limit,))
+        return _attach_agent_wallets(cursor, cursor.fetchall(), 'wallet_agent_address')
 
 def update_savings_deposit(plan_id: str, amount: float, next_deposit: Optional[str], tx_hash: str = None) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
-        cursor.execute("""
-            UPDATE savings_plans SET
-                deposits_completed = deposits_completed + 1,
-                total_saved = total_saved + %s,
-                next_deposit = %s,
-                last_deposit = %s,
-                updated_at = %s
-            WHERE id = %s
-        """, (amount, next_deposit, now_iso, now_iso, plan_id))
+        _execute_prepared(cursor, 'savings_deposit_stmt', (amount, next_deposit, plan_id))
         return cursor.rowcount > 0
 
 def update_savings_plan(plan_id: str, updates: Dict[str, Any]) -> bool:
     if not updates:
         return False
     
+    fields = tuple(field for field in SAVINGS_UPDATE_FIELDS if field in updates)
+    if not fields:
+        return False
+    
+    values = [
+        bool(updates[field]) if field == 'is_active' else updates[field]
+        for field in fields
+    ]
+    values.append(plan_id)
+    
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
-        
-        set_clauses = []
-        values = []
-        
-        allowed_fields = {
-            'name': 'name',
-            'amount': 'amount',
-            'frequency': 'frequency',
-            'execution_time': 'execution_time',
-            'next_deposit': 'next_deposit',
-            'is_active': 'is_active',
-            'total_saved': 'total_saved',
-            'deposits_completed': 'deposits_completed'
-        }
-        
-        for key, db_field in allowed_fields.items():
-            if key in updates:
-                value = updates[key]
-                if key == 'is_active':
-                    value = 1 if value else 0
-                set_clauses.append(f"{db_field} = %s")
-                values.append(value)
-        
-        if not set_clauses:
-            return False
-        
-        set_clauses.append("updated_at = %s")
-        values.append(now_iso)
-        values.append(plan_id)
-        
-        query = f"UPDATE savings_plans SET {', '.join(set_clauses)} WHERE id = %s"
-        cursor.execute(query, values)
-        
+        cursor.execute(_update_sql('savings_plans', fields), values)
         return cursor.rowcount > 0
 
 def set_plan_contract_id(plan_id: str, contract_plan_id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            UPDATE savings_plans SET contract_plan_id = %s, updated_at = %s
+            UPDATE savings_plans SET contract_plan_id = %s, updated_at = NOW()
             WHERE id = %s
-        """, (contract_plan_id, datetime.utcnow().isoformat(), plan_id))
+        """, (contract_plan_id, plan_id))
         return cursor.rowcount > 0
 
 def mark_savings_withdrawn(plan_id: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            UPDATE savings_plans SET withdrawn = 1, is_active = 0, updated_at = %s
+            UPDATE savings_plans SET withdrawn = TRUE, is_active = FALSE, updated_at = NOW()
             WHERE id = %s
-        """, (datetime.utcnow().isoformat(), plan_id))
+        """, (plan_id,))
         return cursor.rowcount > 0
 
 def delete_savings_plan(plan_id: str) -> bool:
@@ -766,37 +1338,77 @@ def log_execution(
 ) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO execution_log (
-                schedule_id, savings_plan_id, user_address, execution_type,
-                amount, destination, tx_hash, status, error_message
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        """, (
-            schedule_id, savings_plan_id, user_address.lower(),
-            execution_type, amount, destination.lower(),
+        _execute_prepared(cursor, 'log_execution_stmt', (
+            schedule_id, savings_plan_id, _addr(user_address),
+            execution_type, amount, _addr(destination),
             tx_hash, status, error_message
+        ), ASYNC_COMMIT)
+        return cursor.fetchone()[0]
+
+def record_execution(
+    schedule_id: Optional[str],
+    savings_plan_id: Optional[str],
+    user_address: str,
+    execution_type: str,
+    amount: float,
+    destination: str,
+    tx_hash: str,
+    next_execution: Optional[str]
+) -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if schedule_id:
+            _execute_prepared(cursor, 'schedule_executed_stmt', (next_execution, schedule_id))
+        else:
+            _execute_prepared(cursor, 'savings_deposit_stmt', (amount, next_execution, savings_plan_id))
+        _execute_prepared(cursor, 'log_execution_stmt', (
+            schedule_id, savings_plan_id, _addr(user_address),
+            execution_type, amount, _addr(destination),
+            tx_hash, 'success', None
         ))
-        result = cursor.fetchone()
-        return result[0] if result else 0
+        return cursor.fetchone()[0]
+
+def record_execution_failure(
+    schedule_id: Optional[str],
+    savings_plan_id: Optional[str],
+    user_address: str,
+    execution_type: str,
+    destination: str,
+    error: str
+) -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if schedule_id:
+            _execute_prepared(cursor, 'schedule_failed_stmt', (error, schedule_id))
+        _execute_prepared(cursor, 'log_execution_stmt', (
+            schedule_id, savings_plan_id, _addr(user_address),
+            execution_type, 0, _addr(destination),
+            None, 'failed', error
+        ))
+        return cursor.fetchone()[0]
 
 def get_execution_history(user_address: str, limit: int = 50) -> List[Dict[str, Any]]:
+    with get_connection(readonly=True) as conn:
+        return _fetch_rows(conn, 'exec_hist_cur', EXEC_HISTORY_SQL, (_addr(user_address), limit), limit, 'exec_history_stmt')
+
+def _purge_before(table: str, column: str, before: datetime) -> int:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("""
-            SELECT * FROM execution_log 
-            WHERE user_address = %s
-            ORDER BY executed_at DESC
-            LIMIT %s
-        """, (user_address.lower(), limit))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        deleted = _drop_month_partitions(conn.cursor(), table, before)
+    
+    while True:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                DELETE FROM {table} WHERE (id, {column}) IN (
+                    SELECT id, {column} FROM {table} WHERE {column} < %s LIMIT %s
+                )
+            """, (before.isoformat(), PURGE_BATCH_SIZE))
+            deleted += cursor.rowcount
+            if cursor.rowcount < PURGE_BATCH_SIZE:
+                return deleted
 
 def delete_old_execution_logs(before: datetime) -> int:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM execution_log WHERE executed_at < %s", (before.isoformat(),))
-        return cursor.rowcount
+    return _purge_before('execution_log', 'executed_at', before)
 
 
 
@@ -804,45 +1416,55 @@ def delete_old_execution_logs(before: datetime) -> int:
 def create_notification(user_address: str, notification_type: str, message: str, tx_hash: Optional[str] = None) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO notifications (user_address, notification_type, message, tx_hash)
-            VALUES (%s, %s, %s, %s)
-            RETURNING id
-        """, (user_address.lower(), notification_type, message, tx_hash))
+        user_address = _addr(user_address)
+        _execute_prepared(cursor, 'create_notification_stmt', (user_address, notification_type, message, tx_hash), ASYNC_COMMIT)
         result = cursor.fetchone()
+        _notify_change(cursor, NOTIFY_CHANNEL, user_address)
         return result[0] if result else 0
 
 def get_notifications(user_address: str, unread_only: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        if unread_only:
-            cursor.execute("""
-                SELECT * FROM notifications 
-                WHERE user_address = %s AND is_read = 0
-                ORDER BY created_at DESC
-                LIMIT %s
-            """, (user_address.lower(), limit))
-        else:
-            cursor.execute("""
-                SELECT * FROM notifications 
-                WHERE user_address = %s
-                ORDER BY created_at DESC
-                LIMIT %s
-            """, (user_address.lower(), limit))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        _execute_prepared(cursor, 'unread_notifications_stmt' if unread_only else 'notifications_stmt', (_addr(user_address), limit))
+        return cursor.fetchall()
 
 def mark_notification_read(notification_id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("UPDATE notifications SET is_read = 1 WHERE id = %s", (notification_id,))
-        return cursor.rowcount > 0
+        _execute_prepared(cursor, 'mark_notification_read_stmt', (notification_id,))
+        row = cursor.fetchone()
+        if not row:
+            return False
+        _notify_change(cursor, NOTIFY_CHANNEL, row[0])
+        return True
 
 def mark_all_notifications_read(user_address: str) -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("UPDATE notifications SET is_read = 1 WHERE user_address = %s", (user_address.lower(),))
-        return cursor.rowcount
+        user_address = _addr(user_address)
+        cursor.execute("""
+            UPDATE notifications SET is_read = TRUE
+            WHERE user_address = %s AND NOT is_read
+            RETURNING id
+        """, (user_address,))
+        marked = cursor.fetchall()
+        if marked:
+            _notify_change(cursor, NOTIFY_CHANNEL, user_address)
+        return len(marked)
+
+def get_unread_notification_count(user_address: str) -> int:
+    user_address = _addr(user_address)
+    cached = _cache_get(_unread_counts, user_address)
+    if cached:
+        return cached[1]
+    
+    generation = _cache_generation
+    with get_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM notifications WHERE user_address = %s AND NOT is_read", (user_address,))
+        count = cursor.fetchone()[0]
+    _cache_put(_unread_counts, user_address, count, generation, UNREAD_COUNT_TTL)
+    return count
 
 
 
@@ -850,43 +1472,60 @@ def mark_all_notifications_read(user_address: str) -> int:
 def register_vault(wallet_address: str, vault_address: str, network: str = "mainnet") -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
+        vault, wallet = _addr(vault_address), _addr(wallet_address)
         try:
             cursor.execute("""
                 INSERT INTO vaults (wallet_address, vault_address, network)
                 VALUES (%s, %s, %s)
                 ON CONFLICT(wallet_address) DO UPDATE SET vault_address = %s, network = %s
-            """, (wallet_address.lower(), vault_address.lower(), network, vault_address.lower(), network))
+            """, (wallet, vault, network, vault, network))
+            _notify_change(cursor, VAULT_CHANNEL, wallet)
             return True
         except Exception:
             return False
 
 def get_vault_by_wallet(wallet_address: str) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+    wallet = _addr(wallet_address)
+    cached = _cache_get(_vault_cache, wallet)
+    if cached:
+        return cached[1]
+    
+    generation = _cache_generation
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM vaults WHERE wallet_address = %s", (wallet_address.lower(),))
+        cursor.execute("SELECT * FROM vaults WHERE wallet_address = %s", (wallet,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+    _cache_put(_vault_cache, wallet, row, generation)
+    return row
 
 def get_all_vaults() -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         cursor.execute("SELECT * FROM vaults ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return cursor.fetchall()
+
 
 
 
+def _transaction_row(tx_data: Dict[str, Any]) -> tuple:
+    return (
+        tx_data['tx_id'],
+        tx_data.get('vault_address', ''),
+        tx_data['agent'],
+        tx_data['vendor'],
+        tx_data['amount'],
+        tx_data['timestamp'],
+        tx_data['execute_after'],
+        bool(tx_data.get('executed', False)),
+        bool(tx_data.get('revoked', False)),
+        tx_data.get('risk_score', 0),
+        json.dumps(tx_data.get('risk_factors', [])),
+        _transaction_hash(tx_data['tx_id'], tx_data['agent'], tx_data['vendor'], tx_data['amount'], tx_data['timestamp'])
+    )
 
 def insert_transaction(tx_data: Dict[str, Any]) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        tx_hash = compute_hash({
-            "tx_id": tx_data['tx_id'],
-            "agent": tx_data['agent'],
-            "vendor": tx_data['vendor'],
-            "amount": tx_data['amount'],
-            "timestamp": tx_data['timestamp']
-        })
         cursor.execute("""
             INSERT INTO transactions (
                 tx_id, vault_address, agent, vendor, amount_wei, timestamp,
@@ -896,199 +1535,219 @@ def insert_transaction(tx_data: Dict[str, Any]) -> bool:
                 executed = EXCLUDED.executed,
                 revoked = EXCLUDED.revoked,
                 updated_at = CURRENT_TIMESTAMP
-        """, (
-            tx_data['tx_id'],
-            tx_data.get('vault_address', ''),
-            tx_data['agent'],
-            tx_data['vendor'],
-            tx_data['amount'],
-            tx_data['timestamp'],
-            tx_data['execute_after'],
-            tx_data.get('executed', 0),
-            tx_data.get('revoked', 0),
-            tx_data.get('risk_score', 0),
-            json.dumps(tx_data.get('risk_factors', [])),
-            tx_hash
-        ))
+        """, _transaction_row(tx_data))
         return cursor.rowcount > 0
 
+def insert_transactions_bulk(transactions: List[Dict[str, Any]]) -> int:
+    rows = {(tx['tx_id'], tx.get('vault_address', '')): _transaction_row(tx) for tx in transactions}
+    if not rows:
+        return 0
+    
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        result = execute_values(cursor, """
+            INSERT INTO transactions (
+                tx_id, vault_address, agent, vendor, amount_wei, timestamp,
+                execute_after, executed, revoked, risk_score, risk_factors, hash
+            ) VALUES %s
+            ON CONFLICT (tx_id, vault_address) DO UPDATE SET
+                executed = EXCLUDED.executed,
+                revoked = EXCLUDED.revoked,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        """, list(rows.values()), page_size=500, fetch=True)
+        return len(result)
+
 def update_transaction_status(tx_id: int, executed: bool = None, revoked: bool = None, reason: str = None) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        updates = ["updated_at = CURRENT_TIMESTAMP"]
-        values = []
-        
-        if executed is not None:
-            updates.append("executed = %s")
-            values.append(1 if executed else 0)
-        if revoked is not None:
-            updates.append("revoked = %s")
-            values.append(1 if revoked else 0)
-        if reason is not None:
-            updates.append("reason = %s")
-            values.append(reason)
-        
-        values.append(tx_id)
-        cursor.execute(f"UPDATE transactions SET {', '.join(updates)} WHERE tx_id = %s", values)
+        _execute_prepared(cursor, 'update_tx_status_stmt', (
+            None if executed is None else bool(executed),
+            None if revoked is None else bool(revoked),
+            reason,
+            tx_id
+        ))
         return cursor.rowcount > 0
 
 def get_pending_transactions(vault_address: Optional[str] = None) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         if vault_address:
-            cursor.execute("""
-                SELECT * FROM transactions 
-                WHERE executed = 0 AND revoked = 0 AND vault_address = %s
-                ORDER BY timestamp DESC
-            """, (vault_address.lower(),))
+            cursor.execute(VAULT_PENDING_TX_SQL, (_addr(vault_address),))
         else:
-            cursor.execute("SELECT * FROM transactions WHERE executed = 0 AND revoked = 0 ORDER BY timestamp DESC")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+            cursor.execute(PENDING_TX_SQL)
+        return cursor.fetchall()
 
 def get_transaction_history(limit: int = 100, offset: int = 0, vault_address: Optional[str] = None) -> List[Dict[str, Any]]:
-    with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+    with get_connection(readonly=True) as conn:
         if vault_address:
-            cursor.execute("""
-                SELECT * FROM transactions 
-                WHERE vault_address = %s
-                ORDER BY timestamp DESC LIMIT %s OFFSET %s
-            """, (vault_address.lower(), limit, offset))
-        else:
-            cursor.execute("SELECT * FROM transactions ORDER BY timestamp DESC LIMIT %s OFFSET %s", (limit, offset))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+            return _fetch_rows(conn, 'tx_hist_cur', VAULT_TX_HISTORY_SQL, (_addr(vault_address), limit, offset), limit)
+        return _fetch_rows(conn, 'tx_hist_cur', TX_HISTORY_SQL, (limit, offset), limit)
 
 def get_transaction_by_id(tx_id: int, vault_address: Optional[str] = None) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         if vault_address:
-            cursor.execute("SELECT * FROM transactions WHERE tx_id = %s AND vault_address = %s", (tx_id, vault_address.lower()))
+            _execute_prepared(cursor, 'get_vault_transaction_stmt', (tx_id, _addr(vault_address)))
         else:
-            cursor.execute("SELECT * FROM transactions WHERE tx_id = %s", (tx_id,))
+            _execute_prepared(cursor, 'get_transaction_stmt', (tx_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
 
 
 
 def update_agent_stats(agent: str, amount: str) -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM agents WHERE address = %s", (agent.lower(),))
-        existing = cursor.fetchone()
-        
-        if existing:
-            new_total = int(existing['total_volume_wei']) + int(amount)
-            new_count = existing['total_transactions'] + 1
-            new_avg = new_total // new_count
-            cursor.execute("""
-                UPDATE agents SET
-                    total_transactions = %s,
-                    total_volume_wei = %s,
-                    avg_amount_wei = %s,
-                    last_active = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE address = %s
-            """, (new_count, str(new_total), str(new_avg), int(datetime.utcnow().timestamp()), agent.lower()))
-        else:
-            cursor.execute("""
-                INSERT INTO agents (address, total_transactions, total_volume_wei, avg_amount_wei, last_active)
-                VALUES (%s, 1, %s, %s, %s)
-            """, (agent.lower(), amount, amount, int(datetime.utcnow().timestamp())))
+        cursor = conn.cursor()
+        agent = _addr(agent)
+        cursor.execute(f"""
+            SELECT pg_advisory_xact_lock(hashtext(%s));
+            INSERT INTO agents (address, total_transactions, total_volume_wei, avg_amount_wei, last_active)
+            VALUES (%s, 1, %s, %s, {EPOCH_NOW})
+            ON CONFLICT (address) DO UPDATE SET
+                total_transactions = agents.total_transactions + 1,
+                total_volume_wei = agents.total_volume_wei + EXCLUDED.total_volume_wei,
+                avg_amount_wei = div(agents.total_volume_wei + EXCLUDED.total_volume_wei, agents.total_transactions + 1),
+                last_active = EXCLUDED.last_active,
+                updated_at = CURRENT_TIMESTAMP
+        """, (f"agent:{agent}", agent, amount, amount))
         return True
 
-def get_agent_profile(agent_address: str) -> Optional[Dict[str, Any]]:
+def bulk_update_agent_stats(entries: List[Tuple[str, str]]) -> int:
+    rows = [(_addr(agent), str(amount)) for agent, amount in entries]
+    if not rows:
+        return 0
+    
     with get_connection() as conn:
+        cursor = conn.cursor()
+        keys = sorted({f"agent:{agent}" for agent, _ in rows})
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(k)) FROM unnest(%s::text[]) AS k", (keys,))
+        execute_values(cursor, f"""
+            WITH batch (address, amount) AS (VALUES %s)
+            INSERT INTO agents (address, total_transactions, total_volume_wei, avg_amount_wei, last_active)
+            SELECT address, COUNT(*), SUM(amount::numeric), div(SUM(amount::numeric), COUNT(*)), {EPOCH_NOW}
+            FROM batch GROUP BY address
+            ON CONFLICT (address) DO UPDATE SET
+                total_transactions = agents.total_transactions + EXCLUDED.total_transactions,
+                total_volume_wei = agents.total_volume_wei + EXCLUDED.total_volume_wei,
+                avg_amount_wei = div(agents.total_volume_wei + EXCLUDED.total_volume_wei, agents.total_transactions + EXCLUDED.total_transactions),
+                last_active = EXCLUDED.last_active,
+                updated_at = CURRENT_TIMESTAMP
+        """, rows, page_size=1000)
+        return len(rows)
+
+def get_agent_profile(agent_address: str) -> Optional[Dict[str, Any]]:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM agents WHERE address = %s", (agent_address.lower(),))
+        cursor.execute("SELECT * FROM agents WHERE address = %s", (_addr(agent_address),))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        return row
 
 def update_vendor_stats(vendor: str, amount: str, is_trusted: bool = False, wallet_address: str = '') -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM vendors WHERE address = %s AND wallet_address = %s", (vendor.lower(), wallet_address.lower()))
-        existing = cursor.fetchone()
-        
-        if existing:
-            new_total = int(existing['total_received_wei']) + int(amount)
-            cursor.execute("""
-                UPDATE vendors SET
-                    total_received_wei = %s,
-                    transaction_count = transaction_count + 1,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE address = %s AND wallet_address = %s
-            """, (str(new_total), vendor.lower(), wallet_address.lower()))
-        else:
-            cursor.execute("""
-                INSERT INTO vendors (wallet_address, address, trusted, total_received_wei, transaction_count)
-                VALUES (%s, %s, %s, %s, 1)
-            """, (wallet_address.lower(), vendor.lower(), 1 if is_trusted else 0, amount))
+        cursor = conn.cursor()
+        vendor, wallet = _addr(vendor), _addr(wallet_address)
+        cursor.execute("""
+            SELECT pg_advisory_xact_lock(hashtext(%s));
+            INSERT INTO vendors (wallet_address, address, trusted, total_received_wei, transaction_count)
+            VALUES (%s, %s, %s, %s, 1)
+            ON CONFLICT (wallet_address, address) DO UPDATE SET
+                total_received_wei = vendors.total_received_wei + EXCLUDED.total_received_wei,
+                transaction_count = vendors.transaction_count + 1,
+                updated_at = CURRENT_TIMESTAMP;
+            SELECT pg_notify(%s, %s)
+        """, (f"vendor:{wallet}:{vendor}", wallet, vendor, bool(is_trusted), amount, VENDOR_CHANNEL, f"{PROCESS_TOKEN}:{wallet}"))
+        conn.invalidations.add((VENDOR_CHANNEL, wallet))
         return True
 
-def get_vendors(trusted_only: bool = False, wallet_address: Optional[str] = None) -> List[Dict[str, Any]]:
+def bulk_update_vendor_stats(entries: List[Tuple[str, str, bool, str]]) -> int:
+    rows = [(_addr(wallet), _addr(vendor), bool(trusted), str(amount)) for vendor, amount, trusted, wallet in entries]
+    if not rows:
+        return 0
+    
     with get_connection() as conn:
+        cursor = conn.cursor()
+        keys = sorted({f"vendor:{wallet}:{vendor}" for wallet, vendor, _, _ in rows})
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(k)) FROM unnest(%s::text[]) AS k", (keys,))
+        execute_values(cursor, """
+            WITH batch (wallet_address, address, trusted, amount) AS (VALUES %s)
+            INSERT INTO vendors (wallet_address, address, trusted, total_received_wei, transaction_count)
+            SELECT wallet_address, address, bool_or(trusted), SUM(amount::numeric), COUNT(*)
+            FROM batch GROUP BY wallet_address, address
+            ON CONFLICT (wallet_address, address) DO UPDATE SET
+                total_received_wei = vendors.total_received_wei + EXCLUDED.total_received_wei,
+                transaction_count = vendors.transaction_count + EXCLUDED.transaction_count,
+                updated_at = CURRENT_TIMESTAMP
+        """, rows, page_size=1000)
+        for wallet in {wallet for wallet, _, _, _ in rows}:
+            _notify_change(cursor, VENDOR_CHANNEL, wallet)
+        return len(rows)
+
+def get_vendors(trusted_only: bool = False, wallet_address: Optional[str] = None) -> List[Dict[str, Any]]:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        wallet = wallet_address.lower() if wallet_address else None
+        wallet = _addr(wallet_address) if wallet_address else None
         
         if wallet:
             if trusted_only:
-                cursor.execute("SELECT * FROM vendors WHERE trusted = 1 AND wallet_address = %s ORDER BY transaction_count DESC", (wallet,))
+                cursor.execute("SELECT * FROM vendors WHERE trusted AND wallet_address = %s ORDER BY transaction_count DESC", (wallet,))
             else:
                 cursor.execute("SELECT * FROM vendors WHERE wallet_address = %s ORDER BY transaction_count DESC", (wallet,))
         else:
             if trusted_only:
-                cursor.execute("SELECT * FROM vendors WHERE trusted = 1 ORDER BY transaction_count DESC")
+                cursor.execute("SELECT * FROM vendors WHERE trusted ORDER BY transaction_count DESC")
             else:
                 cursor.execute("SELECT * FROM vendors ORDER BY transaction_count DESC")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return cursor.fetchall()
 
 def upsert_vendor(address: str, name: str = "", trusted: bool = True, wallet_address: Optional[str] = None) -> bool:
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        now_iso = datetime.utcnow().isoformat()
-        wallet = wallet_address.lower() if wallet_address else ""
-        
-        cursor.execute("SELECT * FROM vendors WHERE address = %s AND wallet_address = %s", (address.lower(), wallet))
-        existing = cursor.fetchone()
+        cursor = conn.cursor()
+        wallet = _addr(wallet_address) if wallet_address else ""
+        address = _addr(address)
         
-        if existing:
-            cursor.execute("""
-                UPDATE vendors SET name = %s, trusted = %s, updated_at = %s
-                WHERE address = %s AND wallet_address = %s
-            """, (name if name else existing["name"], 1 if trusted else 0, now_iso, address.lower(), wallet))
-        else:
-            cursor.execute("""
-                INSERT INTO vendors (wallet_address, address, name, trusted, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (wallet, address.lower(), name, 1 if trusted else 0, now_iso, now_iso))
+        cursor.execute("""
+            INSERT INTO vendors (wallet_address, address, name, trusted)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (wallet_address, address) DO UPDATE SET
+                name = COALESCE(NULLIF(EXCLUDED.name, ''), vendors.name),
+                trusted = EXCLUDED.trusted,
+                updated_at = NOW()
+        """, (wallet, address, name or "", bool(trusted)))
         
-        return cursor.rowcount > 0
+        changed = cursor.rowcount > 0
+        _notify_change(cursor, VENDOR_CHANNEL, wallet)
+        return changed
 
 def get_vendor_by_name(name: str, wallet_address: Optional[str] = None) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
+    wallet = _addr(wallet_address) if wallet_address else None
+    cache_key = (wallet or '', name.lower())
+    cached = _cache_get(_vendor_cache, cache_key)
+    if cached:
+        return cached[1]
+    
+    generation = _cache_generation
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
-        wallet = wallet_address.lower() if wallet_address else None
-        
+        pattern = f"%{_like_escape(name.lower())}%"
         if wallet:
             cursor.execute("""
                 SELECT * FROM vendors 
-                WHERE LOWER(name) LIKE %s AND trusted = 1 AND wallet_address = %s
+                WHERE LOWER(name) LIKE %s AND trusted AND wallet_address = %s
                 ORDER BY transaction_count DESC
                 LIMIT 1
-            """, (f"%{name.lower()}%", wallet))
+            """, (pattern, wallet))
         else:
             cursor.execute("""
                 SELECT * FROM vendors 
-                WHERE LOWER(name) LIKE %s AND trusted = 1
+                WHERE LOWER(name) LIKE %s AND trusted
                 ORDER BY transaction_count DESC
                 LIMIT 1
-            """, (f"%{name.lower()}%",))
+            """, (pattern,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+    _cache_put(_vendor_cache, cache_key, row, generation)
+    return row
 
 
 
@@ -1096,29 +1755,36 @@ def get_vendor_by_name(name: str, wallet_address: Optional[str] = None) -> Optio
 def insert_alert(tx_id: int, alert_type: str, severity: str, message: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO alerts (tx_id, alert_type, severity, message)
-            VALUES (%s, %s, %s, %s)
-        """, (tx_id, alert_type, severity, message))
+        _execute_prepared(cursor, 'insert_alert_stmt', (tx_id, alert_type, severity, message))
         return cursor.rowcount > 0
 
-def get_alerts(acknowledged: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+def insert_alerts_bulk(alerts: List[Tuple[int, str, str, str]]) -> int:
+    if not alerts:
+        return 0
+    
     with get_connection() as conn:
+        cursor = conn.cursor()
+        execute_values(cursor, """
+            INSERT INTO alerts (tx_id, alert_type, severity, message)
+            VALUES %s
+        """, alerts, page_size=500)
+        return len(alerts)
+
+def get_alerts(acknowledged: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    with get_connection(readonly=True) as conn:
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         if acknowledged is not None:
-            cursor.execute("SELECT * FROM alerts WHERE acknowledged = %s ORDER BY created_at DESC LIMIT %s", (acknowledged, limit))
+            cursor.execute("SELECT * FROM alerts WHERE acknowledged = %s ORDER BY created_at DESC LIMIT %s", (bool(acknowledged), limit))
         else:
             cursor.execute("SELECT * FROM alerts ORDER BY created_at DESC LIMIT %s", (limit,))
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return cursor.fetchall()
 
 def acknowledge_alert(alert_id: int, acknowledged_by: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
         cursor.execute(
-            "UPDATE alerts SET acknowledged = 1, acknowledged_by = %s, acknowledged_at = %s WHERE id = %s",
-            (acknowledged_by, now_iso, alert_id)
+            "UPDATE alerts SET acknowledged = TRUE, acknowledged_by = %s, acknowledged_at = NOW() WHERE id = %s",
+            (acknowledged_by, alert_id)
         )
         return cursor.rowcount > 0
 
@@ -1131,133 +1797,310 @@ def insert_audit_log(
     performed_by: str, ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ) -> int:
+    audit_hash = compute_hash({
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "performed_by": performed_by,
+        "timestamp": _utcnow().isoformat()
+    })
+    
     with get_connection() as conn:
         cursor = conn.cursor()
-        
+        cursor.execute("""
+            INSERT INTO audit_log (action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, hash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, audit_hash))
+        return cursor.fetchone()[0]
+
+def insert_audit_logs_bulk(entries: List[tuple]) -> List[int]:
+    if not entries:
+        return []
+    
+    now = _utcnow()
+    rows = []
+    for entry in entries:
+        action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, created_at = (tuple(entry) + (None, None, None))[:9]
+        created_at = created_at or now
         audit_hash = compute_hash({
             "action": action,
             "entity_type": entity_type,
             "entity_id": entity_id,
             "performed_by": performed_by,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": created_at.isoformat()
         })
-        
-        cursor.execute("""
-            INSERT INTO audit_log (action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, hash)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        rows.append((action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, created_at, audit_hash))
+    
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        result = execute_values(cursor, """
+            INSERT INTO audit_log (action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, created_at, hash)
+            VALUES %s
             RETURNING id
-        """, (action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, audit_hash))
-        
-        result = cursor.fetchone()
-        return result[0] if result else 0
+        """, rows, page_size=500, fetch=True)
+        return [row[0] for row in result]
+
+
 
 
+_audit_queue: "queue.Queue[tuple]" = queue.Queue()
+_audit_writer = None
+_audit_lock = threading.Lock()
 
+def queue_audit_log(
+    action: str, entity_type: str, entity_id: str,
+    old_value: Optional[str], new_value: Optional[str],
+    performed_by: str, ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None
+):
+    _audit_queue.put((action, entity_type, entity_id, old_value, new_value, performed_by, ip_address, user_agent, _utcnow()))
+    _ensure_audit_writer()
+
+def _ensure_audit_writer():
+    global _audit_writer
+    if _audit_writer is None:
+        with _audit_lock:
+            if _audit_writer is None:
+                _audit_writer = threading.Thread(target=_write_audit_logs, name="db-audit-writer", daemon=True)
+                _audit_writer.start()
+                atexit.register(flush_audit_logs)
+
+def _drain_audit_queue(timeout: Optional[float]) -> List[tuple]:
+    entries = []
+    try:
+        entries.append(_audit_queue.get(timeout=timeout) if timeout else _audit_queue.get_nowait())
+        while len(entries) < AUDIT_BATCH_SIZE:
+            entries.append(_audit_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return entries
+
+def _write_audit_batch(entries: List[tuple]):
+    for attempt in range(1, AUDIT_MAX_ATTEMPTS + 1):
+        try:
+            insert_audit_logs_bulk(entries)
+            return
+        except Exception as e:
+            error = e
+        if attempt < AUDIT_MAX_ATTEMPTS:
+            time.sleep(AUDIT_RETRY_SECONDS * attempt)
+    for entry in entries:
+        logger.error("Dropping audit log entry after %d failed writes (%s): %s", AUDIT_MAX_ATTEMPTS, error, entry)
+
+def _write_audit_logs():
+    while True:
+        entries = _drain_audit_queue(AUDIT_FLUSH_SECONDS)
+        if entries:
+            _write_audit_batch(entries)
+
+def flush_audit_logs():
+    entries = _drain_audit_queue(None)
+    while entries:
+        _write_audit_batch(entries)
+        entries = _drain_audit_queue(None)
 
 def get_stats() -> Dict[str, Any]:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM transactions")
-        total_tx = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM transactions WHERE executed = 0 AND revoked = 0")
-        pending = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM transactions WHERE executed = 0 AND revoked = 0 AND risk_score >= 0.7")
-        high_risk = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM alerts WHERE acknowledged = 0")
-        unack_alerts = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COALESCE(SUM(CAST(amount_wei AS BIGINT)), 0) FROM transactions WHERE executed = 1")
-        total_volume = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM agents")
-        total_agents = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM vendors WHERE trusted = 1")
-        trusted_vendors = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM recurring_schedules WHERE is_active = 1")
-        active_schedules = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM savings_plans WHERE is_active = 1 AND withdrawn = 0")
-        active_savings = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COALESCE(SUM(total_saved), 0) FROM savings_plans WHERE withdrawn = 0")
-        total_locked = cursor.fetchone()[0]
+    with get_connection(readonly=True) as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT
+                tx.total_tx, tx.pending, tx.high_risk, tx.total_volume,
+                (SELECT COUNT(*) FROM alerts WHERE NOT acknowledged) AS unack_alerts,
+                (SELECT COUNT(*) FROM agents) AS total_agents,
+                (SELECT COUNT(*) FROM vendors WHERE trusted) AS trusted_vendors,
+                (SELECT COUNT(*) FROM recurring_schedules WHERE is_active) AS active_schedules,
+                sp.active_savings, sp.total_locked
+            FROM (
+                SELECT
+                    COUNT(*) AS total_tx,
+                    COUNT(*) FILTER (WHERE NOT executed AND NOT revoked) AS pending,
+                    COUNT(*) FILTER (WHERE NOT executed AND NOT revoked AND risk_score >= 0.7) AS high_risk,
+                    COALESCE(SUM(amount_wei) FILTER (WHERE executed), 0) AS total_volume
+                FROM transactions
+            ) tx, (
+                SELECT
+                    COUNT(*) FILTER (WHERE is_active) AS active_savings,
+                    COALESCE(SUM(total_saved), 0) AS total_locked
+                FROM savings_plans
+                WHERE NOT withdrawn
+            ) sp
+        """)
+        row = cursor.fetchone()
 
         return {
-            "total_transactions": total_tx,
-            "pending_count": pending,
-            "high_risk_pending": high_risk,
-            "unacknowledged_alerts": unack_alerts,
-            "total_volume_wei": str(total_volume),
-            "total_agents": total_agents,
-            "trusted_vendors": trusted_vendors,
-            "active_schedules": active_schedules,
-            "active_savings": active_savings,
-            "total_locked_savings": total_locked
+            "total_transactions": row["total_tx"],
+            "pending_count": row["pending"],
+            "high_risk_pending": row["high_risk"],
+            "unacknowledged_alerts": row["unack_alerts"],
+            "total_volume_wei": str(row["total_volume"]),
+            "total_agents": row["total_agents"],
+            "trusted_vendors": row["trusted_vendors"],
+            "active_schedules": row["active_schedules"],
+            "active_savings": row["active_savings"],
+            "total_locked_savings": row["total_locked"]
         }
 
 def verify_transaction_integrity(tx_id: int) -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT * FROM transactions WHERE tx_id = %s", (tx_id,))
+    with get_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT hash = {TX_HASH_EXPR} FROM transactions WHERE tx_id = %s LIMIT 1", (tx_id,))
         row = cursor.fetchone()
+        return bool(row and row[0])
 
-        if not row:
-            return False
+def find_tampered_transactions(since: Optional[int] = None) -> List[int]:
+    with get_connection(readonly=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT tx_id FROM transactions
+            WHERE hash <> {TX_HASH_EXPR} AND timestamp >= %s
+            ORDER BY tx_id
+        """, (since or 0,))
+        return [row[0] for row in cursor.fetchall()]
 
-        expected_hash = compute_hash({
-            "tx_id": row["tx_id"],
-            "agent": row["agent"],
-            "vendor": row["vendor"],
-            "amount": row["amount_wei"],
-            "timestamp": row["timestamp"]
-        })
 
-        return expected_hash == row["hash"]
 
 
+def _csv_buffer(rows: List[tuple]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['\\N' if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
 
+def _bulk_upsert(table: str, columns: str, rows: List[tuple], patch_sql: str, patches: Dict[str, tuple]) -> int:
+    conflict_sql = "ON CONFLICT (id) DO NOTHING RETURNING id"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if len(rows) > BULK_COPY_THRESHOLD:
+            staging = f"{table}_staging_{uuid.uuid4().hex[:12]}"
+            cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+            cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", _csv_buffer(rows))
+            cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} {conflict_sql}")
+            inserted = {row[0] for row in cursor.fetchall()}
+        elif rows:
+            result = execute_values(cursor, f"INSERT INTO {table} ({columns}) VALUES %s {conflict_sql}", rows, page_size=500, fetch=True)
+            inserted = {row[0] for row in result}
+        else:
+            inserted = set()
+        
+        pending = [item_id for item_id in patches if item_id not in inserted]
+        if pending:
+            cursor.execute(f"SELECT id FROM {table} WHERE id = ANY(%s)", (pending,))
+            found = {row[0] for row in cursor.fetchall()}
+            missing = [item_id for item_id in pending if item_id not in found]
+            if missing:
+                raise ValueError(f"New {table} rows {missing} are missing required fields")
+            execute_batch(cursor, patch_sql, [patches[item_id] + (item_id,) for item_id in pending], page_size=500)
+        return len(inserted) + len(pending)
 
 def bulk_upsert_schedules(schedules: List[Dict[str, Any]]) -> int:
-    count = 0
-    for schedule in schedules:
-        if save_recurring_schedule(schedule):
-            count += 1
-    return count
+    items = {schedule['id']: schedule for schedule in schedules}
+    if not items:
+        return 0
+    
+    return _bulk_upsert('recurring_schedules', """
+        id, user_address, agent_address, vault_address, payment_type,
+        vendor, vendor_address, amount, frequency, execution_time,
+        start_date, next_execution, reason, is_trusted, is_active,
+        network
+    """, [
+        _schedule_row(schedule) for schedule in items.values()
+        if not _missing_fields(schedule, SCHEDULE_REQUIRED_FIELDS)
+    ], SCHEDULE_PATCH_SQL, {item_id: _schedule_patch(schedule) for item_id, schedule in items.items()})
 
 def bulk_upsert_savings_plans(plans: List[Dict[str, Any]]) -> int:
-    count = 0
-    for plan in plans:
-        if save_savings_plan(plan):
-            count += 1
-    return count
-
-def get_all_user_recurring_data(user_address: str) -> Dict[str, Any]:
+    items = {plan['id']: plan for plan in plans}
+    if not items:
+        return 0
+    
+    return _bulk_upsert('savings_plans', """
+        id, user_address, agent_address, vault_address, contract_plan_id,
+        name, amount, frequency, lock_days, lock_type, execution_time,
+        start_date, next_deposit, unlock_date, reason, is_recurring,
+        is_active, total_deposits, target_amount, network,
+        deposits_completed, total_saved, last_deposit
+    """, [
+        _savings_row(plan) + (plan.get('deposits_completed', 0), plan.get('total_saved', 0), plan.get('last_deposit'))
+        for plan in items.values()
+        if not _missing_fields(plan, SAVINGS_REQUIRED_FIELDS)
+    ], SAVINGS_PATCH_SQL, {item_id: _savings_patch(plan) for item_id, plan in items.items()})
+
+def _save_each(cursor, save, items: List[Dict[str, Any]]) -> Tuple[int, List[Tuple[Any, str]]]:
+    saved, failed = 0, []
+    for item in items:
+        cursor.execute("SAVEPOINT sync_row")
+        try:
+            if save(cursor, item):
+                saved += 1
+            else:
+                failed.append((item.get('id'), "not saved"))
+            cursor.execute("RELEASE SAVEPOINT sync_row")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT sync_row")
+            failed.append((item.get('id'), str(e)))
+    return saved, failed
+
+def sync_recurring_data(schedules: List[Dict[str, Any]], plans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    with get_connection() as conn:
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        synced_schedules, failed_schedules = _save_each(cursor, _save_recurring_schedule, schedules)
+        synced_plans, failed_plans = _save_each(cursor, _save_savings_plan, plans)
     return {
-        'schedules': get_recurring_schedules(user_address, active_only=False),
-        'savings_plans': get_savings_plans(user_address, active_only=False),
-        'agent_wallet': get_agent_wallet(user_address)
+        "synced_schedules": synced_schedules,
+        "synced_plans": synced_plans,
+        "failed_schedules": failed_schedules,
+        "failed_plans": failed_plans
     }
 
+def get_all_user_recurring_data(user_address: str) -> Dict[str, Any]:
+    with transaction(readonly=True):
+        return {
+            'schedules': get_recurring_schedules(user_address, active_only=False),
+            'savings_plans': get_savings_plans(user_address, active_only=False),
+            'agent_wallet': get_agent_wallet(user_address)
+        }
+
 
 
 
 def cleanup_expired_sessions() -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
-        now_iso = datetime.utcnow().isoformat()
-        cursor.execute("DELETE FROM sessions WHERE expires_at < %s", (now_iso,))
+        cursor.execute("DELETE FROM sessions WHERE expires_at < NOW() AT TIME ZONE 'UTC'")
         return cursor.rowcount
 
 def backup_database(backup_path: str) -> bool:
-   
-   
-    return False
+    pg_dump = shutil.which("pg_dump")
+    if not pg_dump:
+        print("Backup failed: pg_dump not found, install postgresql-client")
+        return False
+    if not DATABASE_URL:
+        print("Backup failed: DATABASE_URL environment variable not set")
+        return False
+    
+    params = parse_database_url(DATABASE_URL)
+    env = {
+        **os.environ,
+        'PGHOST': params['host'] or '',
+        'PGPORT': str(params['port']),
+        'PGUSER': params['user'] or '',
+        'PGPASSWORD': params['password'] or '',
+        'PGDATABASE': params['dbname'],
+    }
+    try:
+        subprocess.run(
+            [pg_dump, "--format=custom", "--compress=6", "--no-owner", f"--file={backup_path}"],
+            env=env, check=True, capture_output=True, timeout=3600
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Backup failed: {e.stderr.decode(errors='replace').strip()}")
+        return False
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"Backup failed: {e}")
+        return False
+    return True
 
 
 if __name__ == "__main__":
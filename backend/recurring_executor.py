@@ -526,6 +526,7 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
     def __init__(self):
         from database import init_db
         init_db()
+        self._due_after = {}
     
     def _parse_datetime(self, value):
         if value is None:
@@ -543,6 +544,16 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
                     return None
         return None
     
+    def _fetch_due_page(self, fetch, now: datetime, column: str) -> List[Dict[str, Any]]:
+        from database import DUE_BATCH_LIMIT
+        
+        page = fetch(now, after=self._due_after.get(column, ('', '')))
+        if len(page) < DUE_BATCH_LIMIT:
+            self._due_after[column] = ('', '')
+        else:
+            self._due_after[column] = (page[-1][column], page[-1]['id'])
+        return page
+    
     async def get_due_payments(self) -> List[RecurringPayment]:
         from database import get_due_schedules, get_due_savings_deposits
         from database import get_connection
@@ -550,7 +561,7 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
         now = datetime.utcnow()
         payments = []
         
-        schedules = get_due_schedules(now)
+        schedules = self._fetch_due_page(get_due_schedules, now, 'next_execution')
         for s in schedules:
             next_exec = self._parse_datetime(s['next_execution'])
             if next_exec and next_exec <= now:
@@ -571,7 +582,7 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
                     network=s.get('network', 'mainnet')
                 ))
         
-        deposits = get_due_savings_deposits(now)
+        deposits = self._fetch_due_page(get_due_savings_deposits, now, 'next_deposit')
         for d in deposits:
             next_dep = self._parse_datetime(d['next_deposit'])
             if next_dep and next_dep <= now:
@@ -596,22 +607,9 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
         return payments
     
     async def get_agent_wallet(self, user_address: str, network: str = None) -> Optional[AgentWallet]:
-        from database import get_agent_wallet, get_connection
-        from psycopg2.extras import RealDictCursor
+        from database import get_agent_wallet
         
-        with get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            if network:
-                cursor.execute(
-                    "SELECT * FROM agent_wallets WHERE user_address = %s AND network = %s",
-                    (user_address.lower(), network)
-                )
-            else:
-                cursor.execute(
-                    "SELECT * FROM agent_wallets WHERE user_address = %s",
-                    (user_address.lower(),)
-                )
-            row = cursor.fetchone()
+        row = get_agent_wallet(user_address, network)
         
         if not row:
             return None
@@ -626,14 +624,9 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
         )
     
     async def update_payment_execution(self, payment_id: str, tx_hash: str, next_date: datetime, amount: float, user_address: str = '', destination: str = ''):
-        from database import update_schedule_execution, update_savings_deposit, log_execution
+        from database import record_execution
     
-        if payment_id.startswith('sched_'):
-            update_schedule_execution(payment_id, tx_hash, next_date.isoformat())
-        else:
-            update_savings_deposit(payment_id, amount, next_date.isoformat(), tx_hash)
-    
-        log_execution(
+        record_execution(
             schedule_id=payment_id if payment_id.startswith('sched_') else None,
             savings_plan_id=payment_id if not payment_id.startswith('sched_') else None,
             user_address=user_address,
@@ -641,25 +634,19 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
             amount=amount,
             destination=destination,
             tx_hash=tx_hash,
-            status='success'
+            next_execution=next_date.isoformat()
         )
     
     async def update_payment_failure(self, payment_id: str, error: str, user_address: str = '', destination: str = ''):
-        from database import update_schedule_failure, log_execution
+        from database import record_execution_failure
     
-        if payment_id.startswith('sched_'):
-            update_schedule_failure(payment_id, error)
-    
-        log_execution(
+        record_execution_failure(
             schedule_id=payment_id if payment_id.startswith('sched_') else None,
             savings_plan_id=payment_id if not payment_id.startswith('sched_') else None,
             user_address=user_address,
             execution_type='auto',
-            amount=0,
             destination=destination,
-            tx_hash=None,
-            status='failed',
-            error_message=error
+            error=error
         )
     
     async def get_users_with_recurring_payments(self) -> List[str]:
@@ -668,9 +655,9 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
         with get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT user_address FROM recurring_schedules WHERE is_active = 1
+                SELECT DISTINCT user_address FROM recurring_schedules WHERE is_active
                 UNION
-                SELECT DISTINCT user_address FROM savings_plans WHERE is_active = 1 AND is_recurring = 1
+                SELECT DISTINCT user_address FROM savings_plans WHERE is_active AND is_recurring
             """)
             return [row[0] for row in cursor.fetchall()]
     
@@ -714,15 +701,10 @@ class PostgreSQLRecurringDatabase(RecurringDatabase):
         )
     
     async def delete_old_execution_logs(self, before: datetime):
-        from database import get_connection
+        from database import delete_old_execution_logs, ensure_partitions
         
-        with get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "DELETE FROM execution_log WHERE executed_at < %s",
-                (before,)
-            )
-            conn.commit()
+        ensure_partitions()
+        delete_old_execution_logs(before)
 
 
 async def main():
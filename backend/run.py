@@ -65,7 +65,7 @@ def backup_database(output_path=None):
     from database import backup_database as db_backup
     
     if not output_path:
-        output_path = f"sentinel_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        output_path = f"sentinel_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.dump"
     
     if db_backup(output_path):
         print(f"Database backed up to: {output_path}")
@@ -17,14 +17,17 @@ import structlog
 
 from database import (
     init_db,
-    insert_transaction,
+    insert_transactions_bulk,
     update_transaction_status,
-    update_agent_stats,
-    update_vendor_stats,
+    bulk_update_agent_stats,
+    bulk_update_vendor_stats,
     insert_alert,
+    insert_alerts_bulk,
     insert_audit_log,
+    insert_audit_logs_bulk,
     get_agent_profile,
-    get_pending_transactions
+    get_pending_transactions,
+    transaction
 )
 
 load_dotenv()
@@ -180,6 +183,7 @@ class SentinelWatchdog:
         self.notifier = AlertNotifier()
         self.retry_config = RetryConfig()
         self.last_processed_block = 0
+        self.pending_writes = {"transactions": [], "agents": [], "vendors": [], "alerts": [], "audit": []}
         self.stats = {
             "events_processed": 0,
             "alerts_generated": 0,
@@ -213,11 +217,21 @@ class SentinelWatchdog:
         self.last_processed_block = self.w3.eth.block_number
         logger.info("contract_loaded", network=self.network, address=vault_address, block=self.last_processed_block)
 
+    def agent_profile(self, agent: str) -> Optional[Dict[str, Any]]:
+        profile = get_agent_profile(agent)
+        pending = [int(amount) for pending_agent, amount in self.pending_writes["agents"] if pending_agent.lower() == agent.lower()]
+        if not pending:
+            return profile
+
+        count = (profile["total_transactions"] if profile else 0) + len(pending)
+        volume = (int(profile["total_volume_wei"]) if profile else 0) + sum(pending)
+        return {**(profile or {}), "total_transactions": count, "total_volume_wei": str(volume), "avg_amount_wei": str(volume // count)}
+
     def calculate_risk_score(self, agent: str, vendor: str, amount: int, is_trusted: bool) -> tuple[float, List[str]]:
         risk_score = 0.0
         risk_factors = []
 
-        profile = get_agent_profile(agent)
+        profile = self.agent_profile(agent)
 
         if profile:
             avg_amount = int(profile.get("avg_amount_wei", 0))
@@ -285,9 +299,9 @@ class SentinelWatchdog:
             "risk_factors": risk_factors
         }
 
-        insert_transaction(tx_data)
-        update_agent_stats(agent, str(amount))
-        update_vendor_stats(vendor, str(amount), is_trusted)
+        self.pending_writes["transactions"].append(tx_data)
+        self.pending_writes["vendors"].append((vendor, str(amount), is_trusted, ''))
+        self.pending_writes["agents"].append((agent, str(amount)))
 
         self.recent_transactions.append(RecentTransaction(
             tx_id=tx_id,
@@ -300,7 +314,7 @@ class SentinelWatchdog:
 
         if risk_score >= RISK_CONFIG.high_risk_score:
             alert_msg = f"High risk transaction detected. Score: {risk_score:.2f}. Factors: {risk_factors}"
-            insert_alert(tx_id, "high_risk", "critical", alert_msg)
+            self.pending_writes["alerts"].append((tx_id, "high_risk", "critical", alert_msg))
             self.stats["alerts_generated"] += 1
             
             await self.notifier.notify(
@@ -314,17 +328,26 @@ class SentinelWatchdog:
 
         elif risk_score >= RISK_CONFIG.medium_risk_score:
             alert_msg = f"Medium risk transaction. Score: {risk_score:.2f}. Factors: {risk_factors}"
-            insert_alert(tx_id, "medium_risk", "warning", alert_msg)
+            self.pending_writes["alerts"].append((tx_id, "medium_risk", "warning", alert_msg))
             self.stats["alerts_generated"] += 1
             logger.info("medium_risk_transaction", tx_id=tx_id, risk_score=risk_score, factors=risk_factors)
 
         else:
             logger.info("transaction_processed", tx_id=tx_id, risk_score=risk_score)
 
-        insert_audit_log("payment_requested", "transaction", str(tx_id), None, json.dumps(tx_data), "watchdog")
+        self.pending_writes["audit"].append(("payment_requested", "transaction", str(tx_id), None, json.dumps(tx_data), "watchdog"))
 
         return risk_score, risk_factors
 
+    def flush_pending_writes(self):
+        pending, self.pending_writes = self.pending_writes, {"transactions": [], "agents": [], "vendors": [], "alerts": [], "audit": []}
+        with transaction():
+            insert_transactions_bulk(pending["transactions"])
+            bulk_update_agent_stats(pending["agents"])
+            bulk_update_vendor_stats(pending["vendors"])
+            insert_alerts_bulk(pending["alerts"])
+            insert_audit_logs_bulk(pending["audit"])
+
     async def process_payment_executed(self, event: Dict[str, Any]):
         tx_id = event["args"]["txId"]
         update_transaction_status(tx_id, executed=True)
@@ -360,8 +383,11 @@ class SentinelWatchdog:
                 request_events = self.vault.events.PaymentRequested.get_logs(
                     from_block=from_block, to_block=to_block
                 )
-                for event in request_events:
-                    await self.process_payment_request(event)
+                try:
+                    for event in request_events:
+                        await self.process_payment_request(event)
+                finally:
+                    self.flush_pending_writes()
 
                 executed_events = self.vault.events.PaymentExecuted.get_logs(
                     from_block=from_block, to_block=to_block
@@ -404,6 +430,7 @@ class SentinelWatchdog:
             try:
                 pending = get_pending_transactions()
                 now = int(time.time())
+                urgent_alerts = []
 
                 for tx in pending:
                     risk_score = tx.get("risk_score", 0)
@@ -412,7 +439,7 @@ class SentinelWatchdog:
 
                     if risk_score >= RISK_CONFIG.high_risk_score and 0 < time_left < 300:
                         alert_msg = f"High risk TX {tx['tx_id']} executing in {time_left}s. Review immediately."
-                        insert_alert(tx["tx_id"], "urgent_review", "critical", alert_msg)
+                        urgent_alerts.append((tx["tx_id"], "urgent_review", "critical", alert_msg))
                         
                         await self.notifier.notify(
                             "urgent_review",
@@ -426,6 +453,7 @@ class SentinelWatchdog:
                     elif risk_score >= RISK_CONFIG.medium_risk_score and 0 < time_left < 600:
                         logger.info("pending_review_suggested", tx_id=tx["tx_id"], time_left=time_left)
 
+                insert_alerts_bulk(urgent_alerts)
                 await asyncio.sleep(30)
 
             except Exception as e:
@@ -309,7 +309,7 @@ export default function App() {
         message: alert.message,
         timestamp: new Date(alert.created_at).getTime(),
         transactionId: alert.tx_id,
-        acknowledged: alert.acknowledged === 1
+        acknowledged: Boolean(alert.acknowledged)
       })));
     }
   }, []);
@@ -322,7 +322,7 @@ export default function App() {
       setVendors(data.vendors.map(v => ({
         address: v.address,
         name: v.name || 'Unknown',
-        trusted: v.trusted === 1,
+        trusted: Boolean(v.trusted),
         txCount: v.transaction_count,
         volume: ethers.formatUnits(v.total_received_wei || '0', 18)
       })));